@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DataExport
+from .models import DataExport, ExportManifest, LegislatorExport
 
 
 @admin.register(DataExport)
@@ -8,6 +8,7 @@ class DataExportAdmin(admin.ModelAdmin):
         "jurisdiction_name",
         "session_identifier",
         "data_type",
+        "since",
         "created_at",
         "updated_at",
     )
@@ -18,3 +19,28 @@ class DataExportAdmin(admin.ModelAdmin):
 
     def session_identifier(self, m):
         return m.session.identifier
+
+
+@admin.register(ExportManifest)
+class ExportManifestAdmin(admin.ModelAdmin):
+    list_display = (
+        "jurisdiction_name",
+        "session_identifier",
+        "data_type",
+        "high_water_mark",
+        "updated_at",
+    )
+    list_filter = ("data_type", "session__jurisdiction__name")
+    exclude = ("bill_ids", "vote_ids")
+
+    def jurisdiction_name(self, m):
+        return m.session.jurisdiction.name
+
+    def session_identifier(self, m):
+        return m.session.identifier
+
+
+@admin.register(LegislatorExport)
+class LegislatorExportAdmin(admin.ModelAdmin):
+    list_display = ("jurisdiction", "data_type", "created_at", "updated_at")
+    list_filter = ("data_type", "jurisdiction__name")
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from testutils.benchmark import run_benchmarks, run_synthetic_benchmarks
+
+
+class Command(BaseCommand):
+    help = "time bulk exports of a synthetic (or existing) session"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--state", help="benchmark an existing session instead of generating one"
+        )
+        parser.add_argument("--session", default="2020")
+        parser.add_argument("--format", default="csv,json")
+        parser.add_argument("--repeat", type=int, default=1)
+        parser.add_argument("--bills", type=int, default=50000)
+        parser.add_argument("--actions-per-bill", type=int, default=5)
+        parser.add_argument("--sponsors-per-bill", type=int, default=2)
+        parser.add_argument("--votes-per-bill", type=int, default=1)
+        parser.add_argument("--voters-per-vote", type=int, default=40)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="don't delete the synthetic jurisdiction afterwards",
+        )
+
+    def handle(self, *args, **options):
+        data_types = options["format"].split(",")
+        if options["state"]:
+            results = run_benchmarks(
+                options["state"], options["session"], data_types, options["repeat"]
+            )
+        else:
+            results = run_synthetic_benchmarks(
+                session=options["session"],
+                data_types=data_types,
+                repeat=options["repeat"],
+                keep=options["keep"],
+                bills=options["bills"],
+                actions_per_bill=options["actions_per_bill"],
+                sponsors_per_bill=options["sponsors_per_bill"],
+                votes_per_bill=options["votes_per_bill"],
+                voters_per_vote=options["voters_per_vote"],
+            )
+
+        print(
+            f"{'format':8} {'seconds':>8} {'peak MB':>8} {'queries':>8} {'size MB':>8}"
+        )
+        for r in results:
+            print(
+                f"{r['data_type']:8} {r['wall_time']:8.1f} {r['peak_rss_mb']:8.0f} "
+                f"{r['queries']:8} {r.get('size_mb', 0):8.1f}"
+            )
@@ -1,14 +1,25 @@
+import io
 import os
 import csv
 import json
+import time
 import datetime
-import tempfile
 import zipfile
+import tempfile
 import uuid
+import hashlib
+import multiprocessing
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import boto3
+from boto3.s3.transfer import TransferConfig
 import base62
-from django.core.management.base import BaseCommand
-from django.db.models import F
+import pyarrow
+import pyarrow.parquet
+from django.contrib.postgres.fields import ArrayField
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import F, Max, Prefetch, Q
 from openstates.metadata import STATES_BY_NAME
 from openstates.data.models import (
     LegislativeSession,
@@ -30,48 +41,110 @@ from openstates.data.models import (
     VoteCount,
     VoteSource,
 )
-from ...models import DataExport
+from ...models import DataExport, ExportManifest
 from utils.common import abbr_to_jid
 
 
+# rows fetched per round-trip from the server-side cursor while streaming
+EXPORT_CHUNK_SIZE = 2000
+# bills (and their prefetched related objects) held in memory at once for JSON export
+EXPORT_BILL_BATCH_SIZE = 500
+# rows per Parquet row group
+PARQUET_ROW_GROUP_SIZE = 50000
+BULK_S3_BUCKET = "data.openstates.org"
+# point at a local S3 stand-in (e.g. minio) for testing
+BULK_S3_ENDPOINT_URL = os.environ.get("BULK_S3_ENDPOINT_URL")
+# archives larger than this are uploaded in parts of this size (in MB)
+UPLOAD_PART_SIZE_MB = 16
+# parts uploaded concurrently per archive
+UPLOAD_CONCURRENCY = 8
+FORMAT_VERSIONS = {
+    "csv": "CSV Format Version: 2.1",
+    "json": "JSON Format Version: 1.0",
+    "parquet": "Parquet Format Version: 1.0",
+}
+
+
 def _str_uuid():
     return base62.encode(uuid.uuid4().int)
 
 
 def export_csv(filename, data, zf):
-    num = len(data)
-    if not num:
+    """
+    stream a .values() queryset into a CSV member of zf
+
+    rows are read w/ a server-side cursor and written directly into the zip,
+    so memory use does not grow with the size of the table
+    """
+    rows = data.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    first = next(rows, None)
+    if first is None:
         return
-    headers = data[0].keys()
-
-    with tempfile.NamedTemporaryFile("w") as f:
-        print("writing", filename, num, "records")
-        of = csv.DictWriter(f, headers)
-        of.writeheader()
-        of.writerows(data)
-        f.flush()
-        zf.write(f.name, filename)
+
+    num = 0
+    with zf.open(filename, "w", force_zip64=True) as zfh:
+        with io.TextIOWrapper(zfh, encoding="utf-8", newline="") as f:
+            of = csv.DictWriter(f, first.keys())
+            of.writeheader()
+            of.writerow(first)
+            num += 1
+            for row in rows:
+                of.writerow(row)
+                num += 1
+    print("wrote", filename, num, "records")
     return num
 
 
+class JSONArrayWriter:
+    """
+    write items one at a time into a JSON array member of zf
+
+    the member is only created once the first item is written
+    """
+
+    def __init__(self, zf, filename):
+        self.zf = zf
+        self.filename = filename
+        self.num = 0
+        self.f = None
+
+    def write(self, item):
+        if self.f is None:
+            zfh = self.zf.open(self.filename, "w", force_zip64=True)
+            self.f = io.TextIOWrapper(zfh, encoding="utf-8")
+            self.f.write("[")
+        else:
+            self.f.write(", ")
+        json.dump(item, self.f)
+        self.num += 1
+
+    def close(self):
+        if self.f is not None:
+            self.f.write("]")
+            self.f.close()
+            print("wrote", self.filename, self.num, "records")
+        return self.num
+
+
 def export_json(filename, data, zf):
-    num = len(data)
-    if not num:
-        return
+    """
+    stream an iterable of dicts into a JSON array member of zf
 
-    with tempfile.NamedTemporaryFile("w") as f:
-        print("writing", filename, num, "records")
-        json.dump(data, f)
-        f.flush()
-        zf.write(f.name, filename)
-    return num
+    items are serialized one at a time so the full array is never held in memory
+    """
+    writer = JSONArrayWriter(zf, filename)
+    for item in data:
+        writer.write(item)
+    return writer.close() or None
 
 
 def _docver_to_json(dv):
     return {
         "note": dv.note,
         "date": dv.date,
-        "links": list(dv.links.values("url", "media_type")),
+        "links": [
+            {"url": link.url, "media_type": link.media_type} for link in dv.links.all()
+        ],
     }
 
 
@@ -83,12 +156,15 @@ def _vote_to_json(v):
         "start_date": v.start_date,
         "result": v.result,
         "organization__classification": v.organization.classification,
-        "counts": list(v.counts.values("option", "value")),
-        "votes": list(v.votes.values("option", "voter_name")),
+        "counts": [{"option": c.option, "value": c.value} for c in v.counts.all()],
+        "votes": [
+            {"option": pv.option, "voter_name": pv.voter_name} for pv in v.votes.all()
+        ],
     }
 
 
 def _bill_to_json(b):
+    # all related objects are read via .all() so that they come from the prefetch cache
     d = {
         "id": b.id,
         "legislative_session": b.legislative_session.identifier,
@@ -98,19 +174,33 @@ def _bill_to_json(b):
         "chamber": b.from_organization.classification,
         "classification": b.classification,
         "subject": b.subject,
-        "abstracts": list(b.abstracts.values("abstract", "note")),
-        "other_titles": list(b.other_titles.values("title", "note")),
-        "actions": list(
-            b.actions.values(
-                "organization__name", "description", "date", "classification", "order"
-            )
-        ),
+        "abstracts": [
+            {"abstract": a.abstract, "note": a.note} for a in b.abstracts.all()
+        ],
+        "other_titles": [
+            {"title": t.title, "note": t.note} for t in b.other_titles.all()
+        ],
+        "actions": [
+            {
+                "organization__name": a.organization.name,
+                "description": a.description,
+                "date": a.date,
+                "classification": a.classification,
+                "order": a.order,
+            }
+            for a in b.actions.all()
+        ],
         # TODO: action related entities
-        "related_bills": list(b.related_bills.values("related_bill_id")),
-        "sponsors": list(b.sponsorships.values("name", "primary", "classification")),
+        "related_bills": [
+            {"related_bill_id": rb.related_bill_id} for rb in b.related_bills.all()
+        ],
+        "sponsors": [
+            {"name": s.name, "primary": s.primary, "classification": s.classification}
+            for s in b.sponsorships.all()
+        ],
         "documents": [_docver_to_json(d) for d in b.documents.all()],
         "versions": [_docver_to_json(d) for d in b.versions.all()],
-        "sources": list(b.sources.values("url")),
+        "sources": [{"url": s.url} for s in b.sources.all()],
         # votes
         "votes": [_vote_to_json(v) for v in b.votes.all()],
     }
@@ -122,11 +212,193 @@ def _bill_to_json(b):
     return d
 
 
-def export_session_csv(state, session):
-    sobj = LegislativeSession.objects.get(
-        jurisdiction_id=abbr_to_jid(state), identifier=session
+def _session_bills(sobj, since=None):
+    bills = Bill.objects.filter(legislative_session=sobj)
+    if since:
+        # a bill has changed if it or any of its votes have
+        bills = bills.filter(
+            Q(updated_at__gt=since) | Q(votes__updated_at__gt=since)
+        ).distinct()
+    return bills
+
+
+def _session_votes(sobj, since=None):
+    votes = VoteEvent.objects.filter(legislative_session=sobj)
+    if since:
+        votes = votes.filter(updated_at__gt=since)
+    return votes
+
+
+def _ordered(lookup, model):
+    """
+    prefetch lookup in a stable order (the model's own, then id) so that
+    exporting unchanged data gives identical archives
+    """
+    return Prefetch(
+        lookup, queryset=model.objects.order_by(*model._meta.ordering, "id")
     )
-    bills = Bill.objects.filter(legislative_session=sobj).values(
+
+
+def iter_session_bills(sobj, batch_size=EXPORT_BILL_BATCH_SIZE, since=None):
+    """
+    yield all bills in a session, fully prefetched, in primary key batches
+
+    each batch runs its own prefetch queries, so only batch_size bills worth of
+    related objects are alive at any time
+
+    if since is given only bills changed after it are included
+    """
+    bills = (
+        _session_bills(sobj, since)
+        .select_related(
+            "legislative_session",
+            "legislative_session__jurisdiction",
+            "from_organization",
+            "searchable",
+            "searchable__version_link",
+        )
+        .prefetch_related(
+            _ordered("abstracts", BillAbstract),
+            _ordered("other_titles", BillTitle),
+            _ordered("other_identifiers", BillIdentifier),
+            _ordered("actions", BillAction),
+            "actions__organization",
+            _ordered("related_bills", RelatedBill),
+            _ordered("sponsorships", BillSponsorship),
+            _ordered("documents", BillDocument),
+            _ordered("documents__links", BillDocumentLink),
+            _ordered("versions", BillVersion),
+            _ordered("versions__links", BillVersionLink),
+            _ordered("sources", BillSource),
+            _ordered("votes", VoteEvent),
+            "votes__organization",
+            _ordered("votes__counts", VoteCount),
+            _ordered("votes__votes", PersonVote),
+            _ordered("votes__sources", VoteSource),
+        )
+        .order_by("id")
+    )
+    last_id = None
+    while True:
+        batch = bills.filter(id__gt=last_id) if last_id else bills
+        batch = list(batch[:batch_size])
+        if not batch:
+            break
+        yield from batch
+        last_id = batch[-1].id
+
+
+# repr()'s escapes of backslashes & whitespace, as (SQL char, SQL escape)
+_REPR_ESCAPES = (
+    ("'\\'", "'\\\\'"),
+    ("chr(10)", "'\\n'"),
+    ("chr(13)", "'\\r'"),
+    ("chr(9)", "'\\t'"),
+)
+
+
+def _repr_sql(value):
+    """SQL for repr() of a text value, other control characters aren't escaped"""
+    escaped = value
+    for char, escape in _REPR_ESCAPES:
+        escaped = f"replace({escaped}, {char}, {escape})"
+    # like repr(), double quotes are only used for values w/ just single quotes
+    return (
+        f"CASE WHEN strpos({value}, '''') > 0 AND strpos({value}, '\"') = 0 "
+        f"THEN '\"' || {escaped} || '\"' "
+        f"ELSE '''' || replace({escaped}, '''', '\\''') || '''' END"
+    )
+
+
+def _copy_column_sql(column, field):
+    """
+    SQL writing a column the way export_csv does (str() of the Python value),
+    None if PostgreSQL can't produce that
+    """
+    if isinstance(field, ArrayField):
+        if field.base_field.get_internal_type() not in ("CharField", "TextField"):
+            return None
+        items = (
+            f"SELECT {_repr_sql('item')} "
+            f"FROM unnest({column}) WITH ORDINALITY AS u(item, n) ORDER BY n"
+        )
+        return (
+            f"CASE WHEN {column} IS NOT NULL "
+            f"THEN '[' || array_to_string(ARRAY({items}), ', ') || ']' END"
+        )
+    if field.is_relation:
+        field = field.target_field
+
+    internal_type = field.get_internal_type()
+    if internal_type == "BooleanField":
+        return f"CASE WHEN {column} THEN 'True' WHEN NOT {column} THEN 'False' END"
+    elif internal_type == "DateTimeField":
+        utc = f"({column} AT TIME ZONE 'UTC')"
+        return (
+            f"to_char({utc}, 'YYYY-MM-DD HH24:MI:SS') || "
+            f"CASE WHEN to_char({utc}, 'US') = '000000' THEN '' "
+            f"ELSE '.' || to_char({utc}, 'US') END || '+00:00'"
+        )
+    elif internal_type == "JSONField":
+        return None
+    return column
+
+
+def export_csv_copy(filename, data, zf):
+    """
+    write a .values() queryset into a CSV member of zf using PostgreSQL's COPY
+
+    the queryset's SQL is wrapped in COPY ... TO STDOUT and the server-generated
+    CSV bytes are piped straight into the zip, columns are converted in SQL so
+    that values are written just as export_csv writes them (e.g. True/False,
+    Python lists), tables w/ JSON columns are written by export_csv instead
+    """
+    columns = []
+    for name, field in _values_fields(data):
+        sql = _copy_column_sql(f'q."{name}"', field)
+        if sql is None:
+            return export_csv(filename, data, zf)
+        columns.append(f'{sql} AS "{name}"')
+
+    if not data.exists():
+        return
+
+    connection = connections[data.db]
+    sql, params = data.query.sql_with_params()
+    with connection.cursor() as cursor:
+        # COPY doesn't accept bind parameters, so interpolate them client-side
+        query = cursor.cursor.mogrify(sql, params).decode()
+        query = f"SELECT {', '.join(columns)} FROM ({query}) AS q"
+        with zf.open(filename, "w", force_zip64=True) as zfh:
+            cursor.cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH CSV HEADER", zfh)
+        num = cursor.cursor.rowcount
+    print("wrote", filename, num, "records")
+    return num
+
+
+CSV_ENGINES = {"orm": export_csv, "copy": export_csv_copy}
+
+
+def _table_path(state, session, table):
+    return f"{state}/{session}/{state}_{session}_{table}"
+
+
+def session_tables(state, session, sobj, since=None):
+    """
+    yield (table, queryset) for each table of the CSV export (format v2.1)
+
+    use _table_path to get the path of a table within the archive, other tabular
+    formats use the same layout
+
+    if since is given only bills & votes changed after it (and their related
+    rows) are included
+    """
+    bills = _session_bills(sobj, since)
+    votes = _session_votes(sobj, since)
+
+    # every table is ordered so that exporting unchanged data gives identical
+    # archives, see archive_hash
+    yield "bills", bills.values(
         "id",
         "identifier",
         "title",
@@ -135,28 +407,9 @@ def export_session_csv(state, session):
         session_identifier=F("legislative_session__identifier"),
         jurisdiction=F("legislative_session__jurisdiction__name"),
         organization_classification=F("from_organization__classification"),
-    )
-
-    if not bills.count():
-        print(f"no bills for {state} {session}")
-        return
-    random = _str_uuid()
-    filename = f"/tmp/{state}_{session}_csv_{random}.zip"
-    zf = zipfile.ZipFile(filename, "w")
-    ts = datetime.datetime.utcnow()
-    zf.writestr(
-        "README",
-        f"""Open States Data Export
-
-State: {state}
-Session: {session}
-Generated At: {ts}
-CSV Format Version: 2.1
-""",
-    )
-
-    export_csv(f"{state}/{session}/{state}_{session}_bills.csv", bills, zf)
+    ).order_by("id")
 
+    bill_ids = bills.values("id")
     for Model, fname in (
         (BillAbstract, "bill_abstracts"),
         (BillTitle, "bill_titles"),
@@ -168,26 +421,19 @@ CSV Format Version: 2.1
         (BillDocument, "bill_documents"),
         (BillVersion, "bill_versions"),
     ):
-        subobjs = Model.objects.filter(bill__legislative_session=sobj).values()
-        export_csv(f"{state}/{session}/{state}_{session}_{fname}.csv", subobjs, zf)
-
-    subobjs = BillDocumentLink.objects.filter(
-        document__bill__legislative_session=sobj
-    ).values()
-    export_csv(
-        f"{state}/{session}/{state}_{session}_bill_document_links.csv", subobjs, zf
-    )
-    subobjs = BillVersionLink.objects.filter(
-        version__bill__legislative_session=sobj
-    ).values()
-    export_csv(
-        f"{state}/{session}/{state}_{session}_bill_version_links.csv", subobjs, zf
-    )
+        yield fname, Model.objects.filter(bill_id__in=bill_ids).values().order_by("id")
+
+    yield "bill_document_links", BillDocumentLink.objects.filter(
+        document__bill_id__in=bill_ids
+    ).values().order_by("id")
+    yield "bill_version_links", BillVersionLink.objects.filter(
+        version__bill_id__in=bill_ids
+    ).values().order_by("id")
 
     # TODO: BillActionRelatedEntity
 
     # Votes
-    votes = VoteEvent.objects.filter(legislative_session=sobj).values(
+    yield "votes", votes.values(
         "id",
         "identifier",
         "motion_text",
@@ -199,90 +445,541 @@ CSV Format Version: 2.1
         "bill_action_id",
         jurisdiction=F("legislative_session__jurisdiction__name"),
         session_identifier=F("legislative_session__identifier"),
-    )
-    export_csv(f"{state}/{session}/{state}_{session}_votes.csv", votes, zf)
+    ).order_by("id")
+    vote_ids = votes.values("id")
     for Model, fname in (
         (PersonVote, "vote_people"),
         (VoteCount, "vote_counts"),
         (VoteSource, "vote_sources"),
     ):
-        subobjs = Model.objects.filter(vote_event__legislative_session=sobj).values()
-        export_csv(f"{state}/{session}/{state}_{session}_{fname}.csv", subobjs, zf)
-
-    orgs = Organization.objects.filter(jurisdiction_id=sobj.jurisdiction_id).values()
-    export_csv(f"{state}/{session}/{state}_{session}_organizations.csv", orgs, zf)
+        yield fname, Model.objects.filter(vote_event_id__in=vote_ids).values().order_by(
+            "id"
+        )
 
-    return filename
+    yield "organizations", Organization.objects.filter(
+        jurisdiction_id=sobj.jurisdiction_id
+    ).values().order_by("id")
 
 
-def export_session_json(state, session):
-    sobj = LegislativeSession.objects.get(
-        jurisdiction_id=abbr_to_jid(state), identifier=session
-    )
-    bills = [
-        _bill_to_json(b)
-        for b in Bill.objects.filter(legislative_session=sobj)
-        .select_related(
-            "legislative_session",
-            "legislative_session__jurisdiction",
-            "from_organization",
-            "searchable",
-        )
-        .prefetch_related(
-            "abstracts",
-            "other_titles",
-            "other_identifiers",
-            "actions",
-            "related_bills",
-            "sponsorships",
-            "documents",
-            "documents__links",
-            "versions",
-            "versions__links",
-            "sources",
-            "votes",
-            "votes__counts",
-            "votes__votes",
-        )
+def _values_fields(data):
+    """
+    get (column name, model field) for each column of a .values() queryset
+    """
+    query = data.query
+    fields = [(name, data.model._meta.get_field(name)) for name in query.values_select]
+    fields += [
+        (name, annotation.output_field)
+        for name, annotation in query.annotation_select.items()
     ]
+    return fields
+
+
+def _arrow_column(field):
+    """
+    get the Arrow type for a model field and a function to convert its values
+    (or None if they can be used as-is)
+    """
+    if isinstance(field, ArrayField):
+        item_type, convert_item = _arrow_column(field.base_field)
+        if not convert_item:
+            return pyarrow.list_(item_type), None
+
+        def convert_list(value):
+            return [convert_item(v) for v in value]
+
+        return pyarrow.list_(item_type), convert_list
+    if field.is_relation:
+        field = field.target_field
+
+    internal_type = field.get_internal_type()
+    if internal_type in (
+        "AutoField",
+        "BigAutoField",
+        "IntegerField",
+        "BigIntegerField",
+        "SmallIntegerField",
+        "PositiveIntegerField",
+        "PositiveSmallIntegerField",
+    ):
+        return pyarrow.int64(), None
+    elif internal_type == "FloatField":
+        return pyarrow.float64(), None
+    elif internal_type == "BooleanField":
+        return pyarrow.bool_(), None
+    elif internal_type == "DateTimeField":
+        return pyarrow.timestamp("us", tz="UTC"), None
+    elif internal_type == "DateField":
+        return pyarrow.date32(), None
+    elif internal_type == "JSONField":
+        return pyarrow.string(), json.dumps
+    elif internal_type in ("CharField", "TextField", "URLField"):
+        return pyarrow.string(), None
+    else:
+        return pyarrow.string(), str
+
+
+def export_parquet(filename, data, zf):
+    """
+    stream a .values() queryset into a typed Parquet member of zf
+
+    column types are derived from the model fields, rows are read w/ a
+    server-side cursor and written out PARQUET_ROW_GROUP_SIZE rows at a time
+    """
+    columns = [(name, *_arrow_column(field)) for name, field in _values_fields(data)]
+    schema = pyarrow.schema([(name, arrow_type) for name, arrow_type, _ in columns])
+    converters = [(name, convert) for name, _, convert in columns if convert]
+
+    rows = data.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    batch = list(islice(rows, PARQUET_ROW_GROUP_SIZE))
+    if not batch:
+        return
+
+    num = 0
+    with zf.open(filename, "w", force_zip64=True) as zfh:
+        writer = pyarrow.parquet.ParquetWriter(zfh, schema)
+        while batch:
+            for row in batch:
+                for name, convert in converters:
+                    if row[name] is not None:
+                        row[name] = convert(row[name])
+            writer.write_batch(pyarrow.RecordBatch.from_pylist(batch, schema=schema))
+            num += len(batch)
+            batch = list(islice(rows, PARQUET_ROW_GROUP_SIZE))
+        writer.close()
+    print("wrote", filename, num, "records")
+    return num
+
+
+def _new_archive(state, session, data_type, format_version, since=None):
+    kind = f"{data_type}_delta" if since else data_type
     random = _str_uuid()
-    filename = f"/tmp/{state}_{session}_json_{random}.zip"
+    filename = f"/tmp/{state}_{session}_{kind}_{random}.zip"
     zf = zipfile.ZipFile(filename, "w")
     ts = datetime.datetime.utcnow()
-    zf.writestr(
-        "README",
-        f"""Open States Data Export
+    readme = f"""Open States Data Export
 
 State: {state}
 Session: {session}
 Generated At: {ts}
-JSON Format Version: 1.0
-""",
+{format_version}
+"""
+    if since:
+        readme += f"Changes Since: {since}\n"
+    zf.writestr("README", readme)
+    return filename, zf
+
+
+def export_session_csv(state, session, engine="orm", since=None):
+    write_csv = CSV_ENGINES[engine]
+    sobj = LegislativeSession.objects.get(
+        jurisdiction_id=abbr_to_jid(state), identifier=session
     )
 
-    if export_json(f"{state}/{session}/{state}_{session}_bills.json", bills, zf):
-        return filename
+    if not Bill.objects.filter(legislative_session=sobj).exists():
+        print(f"no bills for {state} {session}")
+        return
+    filename, zf = _new_archive(state, session, "csv", FORMAT_VERSIONS["csv"], since)
+
+    for table, data in session_tables(state, session, sobj, since):
+        write_csv(_table_path(state, session, table) + ".csv", data, zf)
+    zf.close()
+
+    return filename
+
+
+def export_session_parquet(state, session, since=None):
+    sobj = LegislativeSession.objects.get(
+        jurisdiction_id=abbr_to_jid(state), identifier=session
+    )
+
+    if not Bill.objects.filter(legislative_session=sobj).exists():
+        print(f"no bills for {state} {session}")
+        return
+    filename, zf = _new_archive(
+        state, session, "parquet", FORMAT_VERSIONS["parquet"], since
+    )
 
+    for table, data in session_tables(state, session, sobj, since):
+        export_parquet(_table_path(state, session, table) + ".parquet", data, zf)
+    zf.close()
 
-def upload_and_publish(state, session, filename, data_type):
+    return filename
+
+
+def export_session_json(state, session, since=None):
     sobj = LegislativeSession.objects.get(
         jurisdiction_id=abbr_to_jid(state), identifier=session
     )
-    s3 = boto3.client("s3")
+    bills = (_bill_to_json(b) for b in iter_session_bills(sobj, since=since))
+    filename, zf = _new_archive(state, session, "json", FORMAT_VERSIONS["json"], since)
+
+    num = export_json(f"{state}/{session}/{state}_{session}_bills.json", bills, zf)
+    zf.close()
+    # a delta is still worth publishing if it only contains deletions
+    if num or since:
+        return filename
+
+
+def export_session(state, session, data_type, csv_engine="orm", since=None):
+    if data_type == "csv":
+        return export_session_csv(state, session, csv_engine, since=since)
+    elif data_type == "parquet":
+        return export_session_parquet(state, session, since=since)
+    else:
+        return export_session_json(state, session, since=since)
+
+
+class _CSVSpool:
+    """
+    rows for one CSV table, spooled to disk until the archive is assembled
+
+    a zip can only have one member open for writing, so tables that are filled
+    in at the same time can't be streamed into it directly
+    """
+
+    extension = "csv"
+
+    def __init__(self, data):
+        self.columns = [name for name, _ in _values_fields(data)]
+        self.f = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.f, self.columns)
+        self.num = 0
+
+    def write(self, row):
+        if not self.num:
+            self.writer.writeheader()
+        self.writer.writerow(row)
+        self.num += 1
+
+    def finish(self, zf, filename):
+        if self.num:
+            self.f.seek(0)
+            with zf.open(filename, "w", force_zip64=True) as zfh:
+                with io.TextIOWrapper(zfh, encoding="utf-8", newline="") as out:
+                    for chunk in iter(lambda: self.f.read(1024 * 1024), ""):
+                        out.write(chunk)
+            print("wrote", filename, self.num, "records")
+        self.f.close()
+
+
+class _ParquetSpool:
+    """
+    rows for one Parquet table, written to a temporary file in row groups
+    """
+
+    extension = "parquet"
+
+    def __init__(self, data):
+        columns = [
+            (name, *_arrow_column(field)) for name, field in _values_fields(data)
+        ]
+        self.schema = pyarrow.schema(
+            [(name, arrow_type) for name, arrow_type, _ in columns]
+        )
+        self.converters = [(name, convert) for name, _, convert in columns if convert]
+        self.f = tempfile.TemporaryFile()
+        self.writer = None
+        self.batch = []
+        self.num = 0
+
+    def write(self, row):
+        row = dict(row)
+        for name, convert in self.converters:
+            if row[name] is not None:
+                row[name] = convert(row[name])
+        self.batch.append(row)
+        self.num += 1
+        if len(self.batch) >= PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self.writer is None:
+            self.writer = pyarrow.parquet.ParquetWriter(self.f, self.schema)
+        self.writer.write_batch(
+            pyarrow.RecordBatch.from_pylist(self.batch, schema=self.schema)
+        )
+        self.batch = []
+
+    def finish(self, zf, filename):
+        if self.num:
+            if self.batch:
+                self._flush()
+            self.writer.close()
+            self.f.seek(0)
+            with zf.open(filename, "w", force_zip64=True) as zfh:
+                for chunk in iter(lambda: self.f.read(1024 * 1024), b""):
+                    zfh.write(chunk)
+            print("wrote", filename, self.num, "records")
+        self.f.close()
+
+
+TABLE_SPOOLS = {"csv": _CSVSpool, "parquet": _ParquetSpool}
+
+
+def _table_row(columns, obj, extra):
+    return {
+        name: extra[name] if name in extra else getattr(obj, name) for name in columns
+    }
+
+
+def _vote_table_objects(vote, vote_extra):
+    yield "votes", vote, vote_extra
+    for table, related in (
+        ("vote_people", vote.votes),
+        ("vote_counts", vote.counts),
+        ("vote_sources", vote.sources),
+    ):
+        for obj in related.all():
+            yield table, obj, {}
+
+
+def _bill_table_objects(bill, sobj, since=None):
+    """
+    yield (table, object, annotated column values) for each row a prefetched bill
+    contributes to session_tables()
+    """
+    jurisdiction = sobj.jurisdiction.name
+    yield "bills", bill, {
+        "session_identifier": sobj.identifier,
+        "jurisdiction": jurisdiction,
+        "organization_classification": bill.from_organization.classification
+        if bill.from_organization
+        else None,
+    }
+    for table, related in (
+        ("bill_abstracts", bill.abstracts),
+        ("bill_titles", bill.other_titles),
+        ("bill_identifiers", bill.other_identifiers),
+        ("bill_actions", bill.actions),
+        ("bill_sources", bill.sources),
+        ("bill_related_bills", bill.related_bills),
+        ("bill_sponsorships", bill.sponsorships),
+        ("bill_documents", bill.documents),
+        ("bill_versions", bill.versions),
+    ):
+        for obj in related.all():
+            yield table, obj, {}
+    for doc in bill.documents.all():
+        for link in doc.links.all():
+            yield "bill_document_links", link, {}
+    for version in bill.versions.all():
+        for link in version.links.all():
+            yield "bill_version_links", link, {}
+
+    vote_extra = {"session_identifier": sobj.identifier, "jurisdiction": jurisdiction}
+    for vote in bill.votes.all():
+        # the votes table only has votes from this session
+        if vote.legislative_session_id != sobj.id:
+            continue
+        if since and vote.updated_at <= since:
+            continue
+        yield from _vote_table_objects(vote, vote_extra)
+
+
+def export_session_formats(state, session, data_types, since=None):
+    """
+    export a session in several formats from a single read of the database
+
+    each batch of prefetched bills feeds the JSON writer and the rows of every
+    tabular (CSV/Parquet) table at once, returns {data_type: archive filename}
+    """
+    sobj = LegislativeSession.objects.select_related("jurisdiction").get(
+        jurisdiction_id=abbr_to_jid(state), identifier=session
+    )
+
+    if not Bill.objects.filter(legislative_session=sobj).exists():
+        print(f"no bills for {state} {session}")
+        return {}
+    archives = {
+        data_type: _new_archive(
+            state, session, data_type, FORMAT_VERSIONS[data_type], since
+        )
+        for data_type in data_types
+    }
+
+    json_writer = None
+    if "json" in archives:
+        json_writer = JSONArrayWriter(
+            archives["json"][1], _table_path(state, session, "bills") + ".json"
+        )
+    tables = dict(session_tables(state, session, sobj, since))
+    columns = {
+        table: [name for name, _ in _values_fields(data)]
+        for table, data in tables.items()
+    }
+    spools = {
+        table: [
+            TABLE_SPOOLS[data_type](data)
+            for data_type in data_types
+            if data_type in TABLE_SPOOLS
+        ]
+        for table, data in tables.items()
+    }
+
+    def write_row(table, row):
+        for spool in spools[table]:
+            spool.write(row)
+
+    for bill in iter_session_bills(sobj, since=since):
+        if json_writer:
+            json_writer.write(_bill_to_json(bill))
+        if spools["bills"]:
+            for table, obj, extra in _bill_table_objects(bill, sobj, since):
+                write_row(table, _table_row(columns[table], obj, extra))
+
+    if spools["votes"]:
+        # votes that weren't reached through one of the session's bills
+        votes = (
+            _session_votes(sobj, since)
+            .exclude(bill__legislative_session=sobj)
+            .prefetch_related(
+                _ordered("votes", PersonVote),
+                _ordered("counts", VoteCount),
+                _ordered("sources", VoteSource),
+            )
+            .order_by("id")
+        )
+        vote_extra = {
+            "session_identifier": sobj.identifier,
+            "jurisdiction": sobj.jurisdiction.name,
+        }
+        for vote in votes:
+            for table, obj, extra in _vote_table_objects(vote, vote_extra):
+                write_row(table, _table_row(columns[table], obj, extra))
+        for row in tables["organizations"].iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            write_row("organizations", row)
+
+    filenames = {}
+    for data_type, (filename, zf) in archives.items():
+        if data_type == "json":
+            num = json_writer.close()
+            zf.close()
+            # a delta is still worth publishing if it only contains deletions
+            if num or since:
+                filenames[data_type] = filename
+        else:
+            for table, table_spools in spools.items():
+                for spool in table_spools:
+                    if spool.extension == data_type:
+                        path = _table_path(state, session, table)
+                        spool.finish(zf, f"{path}.{spool.extension}")
+            zf.close()
+            filenames[data_type] = filename
+    return filenames
+
+
+def archive_hash(filename):
+    """
+    sha256 of the names & contents of an archive's members
+
+    the README (which contains the export time) is left out so that
+    re-exporting unchanged data gives the same hash
+    """
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(filename) as zf:
+        for name in sorted(zf.namelist()):
+            if name == "README":
+                continue
+            digest.update(name.encode("utf8") + b"\0")
+            with zf.open(name) as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _s3_client():
+    return boto3.client("s3", endpoint_url=BULK_S3_ENDPOINT_URL)
+
+
+def upload_file(filename, s3_path, part_size_mb=UPLOAD_PART_SIZE_MB):
+    s3 = _s3_client()
 
-    BULK_S3_BUCKET = "data.openstates.org"
     basename = os.path.basename(filename)
-    s3_path = f"{data_type}/latest/"
     s3_url = f"https://{BULK_S3_BUCKET}/{s3_path}{basename}"
 
+    # files over part_size are sent as a multipart upload with parts in parallel
+    part_size = part_size_mb * 1024 * 1024
+    config = TransferConfig(
+        multipart_threshold=part_size,
+        multipart_chunksize=part_size,
+        max_concurrency=UPLOAD_CONCURRENCY,
+    )
     s3.upload_file(
-        filename, BULK_S3_BUCKET, s3_path + basename, ExtraArgs={"ACL": "public-read"}
+        filename,
+        BULK_S3_BUCKET,
+        s3_path + basename,
+        ExtraArgs={"ACL": "public-read"},
+        Config=config,
     )
     print("uploaded", s3_url)
+    return s3_url
+
+
+def upload_and_publish(
+    state, session, filename, data_type, part_size_mb=UPLOAD_PART_SIZE_MB
+):
+    """
+    upload & record an export, unless it is identical to the last one published
+
+    returns True if the file was uploaded
+    """
+    sobj = LegislativeSession.objects.get(
+        jurisdiction_id=abbr_to_jid(state), identifier=session
+    )
+    content_hash = archive_hash(filename)
+    previous = DataExport.objects.filter(
+        session=sobj, data_type=data_type, since__isnull=True
+    ).first()
+    if previous and previous.content_hash == content_hash:
+        print(f"{data_type} export of {state} {session} unchanged, skipping upload")
+        return False
+
+    s3_url = upload_file(filename, f"{data_type}/latest/", part_size_mb)
     obj, created = DataExport.objects.update_or_create(
         session=sobj,
         data_type=data_type,
-        defaults=dict(url=s3_url),
+        since=None,
+        defaults=dict(url=s3_url, content_hash=content_hash),
+    )
+    return True
+
+
+def upload_and_publish_delta(
+    sobj, filename, data_type, since, part_size_mb=UPLOAD_PART_SIZE_MB
+):
+    """upload & record a delta export, each one is kept alongside the full export"""
+    content_hash = archive_hash(filename)
+    s3_url = upload_file(filename, f"{data_type}/delta/", part_size_mb)
+    DataExport.objects.create(
+        session=sobj,
+        data_type=data_type,
+        url=s3_url,
+        content_hash=content_hash,
+        since=since,
+    )
+
+
+def get_session_snapshot(sobj):
+    """
+    get the current high-water mark and bill/vote ids for a session
+    """
+    bills = Bill.objects.filter(legislative_session=sobj)
+    votes = VoteEvent.objects.filter(legislative_session=sobj)
+    marks = [
+        bills.aggregate(hwm=Max("updated_at"))["hwm"],
+        votes.aggregate(hwm=Max("updated_at"))["hwm"],
+    ]
+    return {
+        "high_water_mark": max((m for m in marks if m), default=None),
+        "bill_ids": list(bills.values_list("id", flat=True)),
+        "vote_ids": list(votes.values_list("id", flat=True)),
+    }
+
+
+def record_manifest(sobj, data_type, snapshot):
+    ExportManifest.objects.update_or_create(
+        session=sobj, data_type=data_type, defaults=snapshot
     )
 
 
@@ -308,19 +1005,181 @@ def get_available_sessions(state, updated_since=0):
     return sorted(sessions)
 
 
-def export_data(state, session, data_type):
-    if data_type == "csv":
-        filename = export_session_csv(state, session)
-    else:
-        filename = export_session_json(state, session)
-    if filename:
-        upload_and_publish(state, session, filename, data_type)
+def _export_formats(state, session, data_types, csv_engine="orm", since=None):
+    if len(data_types) == 1:
+        data_type = data_types[0]
+        filename = export_session(state, session, data_type, csv_engine, since=since)
+        return {data_type: filename} if filename else {}
+    return export_session_formats(state, session, data_types, since=since)
+
+
+def _export_deltas(
+    state,
+    session,
+    sobj,
+    manifests,
+    snapshot,
+    csv_engine="orm",
+    part_size_mb=UPLOAD_PART_SIZE_MB,
+):
+    """
+    export & upload only what changed since the last recorded export of a session
+
+    the archives contain bills & votes updated after the earliest previous
+    high-water mark and a manifest.json listing ids that have been deleted since
+    """
+    changes = {}
+    for data_type, manifest in manifests.items():
+        since = manifest.high_water_mark
+        until = snapshot["high_water_mark"] or since
+        deleted_bills = sorted(set(manifest.bill_ids) - set(snapshot["bill_ids"]))
+        deleted_votes = sorted(set(manifest.vote_ids) - set(snapshot["vote_ids"]))
+        if until <= since and not deleted_bills and not deleted_votes:
+            print(f"no {data_type} changes to {state} {session} since {since}")
+            continue
+        changes[data_type] = {
+            "state": state,
+            "session": session,
+            "until": until.isoformat(),
+            "deleted_bills": deleted_bills,
+            "deleted_votes": deleted_votes,
+        }
+    if not changes:
+        return
+
+    # use a single pass for all formats, possibly repeating a few changes
+    since = min(manifests[data_type].high_water_mark for data_type in changes)
+    filenames = _export_formats(state, session, list(changes), csv_engine, since)
+    for data_type, filename in filenames.items():
+        with zipfile.ZipFile(filename, "a") as zf:
+            zf.writestr(
+                "manifest.json",
+                json.dumps({"since": since.isoformat(), **changes[data_type]}),
+            )
+        upload_and_publish_delta(sobj, filename, data_type, since, part_size_mb)
+        record_manifest(sobj, data_type, snapshot)
 
 
-def export_all_states(data_type, updates_since):
-    for state in STATES_BY_NAME.values():
-        for session in get_available_sessions(state.abbr, updates_since):
-            export_data(state.abbr, session, data_type)
+def export_data(
+    state,
+    session,
+    data_types,
+    csv_engine="orm",
+    delta=False,
+    part_size_mb=UPLOAD_PART_SIZE_MB,
+):
+    """
+    export & publish a session in each of data_types
+
+    several formats are written from a single pass over the data, with delta
+    only the changes since each format's last export are published, full
+    exports identical to the last published one are not uploaded again
+    """
+    sobj = LegislativeSession.objects.get(
+        jurisdiction_id=abbr_to_jid(state), identifier=session
+    )
+    # manifests are only kept (& so bill/vote ids only stored) for deltas
+    snapshot = None
+    manifests = {}
+    if delta:
+        # snapshot before exporting, anything that changes mid-export will be
+        # picked up again by the next delta
+        snapshot = get_session_snapshot(sobj)
+        manifests = {
+            m.data_type: m
+            for m in ExportManifest.objects.filter(
+                session=sobj, data_type__in=data_types, high_water_mark__isnull=False
+            )
+        }
+    full = [data_type for data_type in data_types if data_type not in manifests]
+    if delta and full:
+        print(
+            f"no previous {','.join(full)} export of {state} {session}, doing a full export"
+        )
+
+    if full:
+        for data_type, filename in _export_formats(
+            state, session, full, csv_engine
+        ).items():
+            upload_and_publish(state, session, filename, data_type, part_size_mb)
+            if snapshot:
+                record_manifest(sobj, data_type, snapshot)
+    if manifests:
+        _export_deltas(
+            state, session, sobj, manifests, snapshot, csv_engine, part_size_mb
+        )
+
+
+def _init_worker():
+    # forked workers inherit the parent's DB connection, drop it so that each
+    # process opens (and keeps) its own
+    connections.close_all()
+
+
+def _timed_export(state, session, data_types, options):
+    start = time.time()
+    export_data(state, session, data_types, **options)
+    return time.time() - start
+
+
+def export_sessions(jobs, data_types, workers=1, **options):
+    """
+    export & publish each (state, session) in jobs, options are passed to export_data
+
+    with workers > 1 the jobs are fanned out to a process pool, otherwise they
+    run one after another in this process
+
+    returns a dict mapping (state, session) to the seconds the job took
+    """
+    timings = {}
+
+    if workers <= 1:
+        for state, session in jobs:
+            timings[(state, session)] = _timed_export(
+                state, session, data_types, options
+            )
+            print(f"exported {state} {session} in {timings[(state, session)]:.1f}s")
+        return timings
+
+    # don't hand an open connection to the forked workers
+    connections.close_all()
+    failures = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+    ) as pool:
+        futures = {
+            pool.submit(_timed_export, state, session, data_types, options): (
+                state,
+                session,
+            )
+            for state, session in jobs
+        }
+        for future in as_completed(futures):
+            state, session = futures[future]
+            try:
+                timings[(state, session)] = future.result()
+            except Exception as e:
+                print(f"failed to export {state} {session}: {e!r}")
+                failures.append((state, session))
+            else:
+                print(f"exported {state} {session} in {timings[(state, session)]:.1f}s")
+
+    if failures:
+        raise CommandError(
+            "failed to export: " + ", ".join(f"{st} {se}" for st, se in failures)
+        )
+    return timings
+
+
+def export_all_states(data_types, updates_since, workers=1, **options):
+    jobs = [
+        (state.abbr, session)
+        for state in STATES_BY_NAME.values()
+        for session in get_available_sessions(state.abbr, updates_since)
+    ]
+    export_sessions(jobs, data_types, workers, **options)
 
 
 class Command(BaseCommand):
@@ -331,17 +1190,52 @@ class Command(BaseCommand):
         parser.add_argument("sessions", nargs="*")
         parser.add_argument("--all-sessions", action="store_true")
         parser.add_argument("--with-updates-days", type=int, default=0)  # days
-        parser.add_argument("--format")
+        parser.add_argument(
+            "--format",
+            help="csv, json, or parquet, or several separated by commas "
+            "(written from a single pass over the data)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="number of sessions to export in parallel",
+        )
+        parser.add_argument(
+            "--csv-engine",
+            choices=list(CSV_ENGINES),
+            default="orm",
+            help="'copy' streams each CSV table directly from PostgreSQL "
+            "(only used when exporting CSV alone)",
+        )
+        parser.add_argument(
+            "--delta",
+            action="store_true",
+            help="only export changes since the last export of each session",
+        )
+        parser.add_argument(
+            "--part-size",
+            type=int,
+            default=UPLOAD_PART_SIZE_MB,
+            help="size in MB of the parts large files are uploaded to S3 in",
+        )
 
     def handle(self, *args, **options):
-        data_type = options["format"]
-        if data_type not in ("csv", "json"):
-            raise ValueError("--format must be csv or json")
+        data_types = list(dict.fromkeys((options["format"] or "").split(",")))
+        if not all(data_type in FORMAT_VERSIONS for data_type in data_types):
+            raise ValueError("--format must be csv, json, or parquet")
         state = options["state"]
 
         # special case
         if state == "all":
-            export_all_states(data_type, options["with_updates_days"])
+            export_all_states(
+                data_types,
+                options["with_updates_days"],
+                options["workers"],
+                csv_engine=options["csv_engine"],
+                delta=options["delta"],
+                part_size_mb=options["part_size"],
+            )
             return
 
         sessions = get_available_sessions(state, options["with_updates_days"])
@@ -358,6 +1252,16 @@ class Command(BaseCommand):
             for session in sessions:
                 print("    ", session)
         else:
-            for session in options["sessions"]:
-                if session in sessions:
-                    export_data(state, session, data_type)
+            jobs = [
+                (state, session)
+                for session in options["sessions"]
+                if session in sessions
+            ]
+            export_sessions(
+                jobs,
+                data_types,
+                options["workers"],
+                csv_engine=options["csv_engine"],
+                delta=options["delta"],
+                part_size_mb=options["part_size"],
+            )
@@ -0,0 +1,211 @@
+import os
+import csv
+import json
+import hashlib
+import tempfile
+from django.core.management.base import BaseCommand
+from openstates.metadata import STATES_BY_NAME
+from openstates.data.models import Jurisdiction, Person
+from ...models import LegislatorExport
+from .bulk_export import upload_file
+from utils.common import abbr_to_jid
+
+# columns documented on /data/legislator-csv/
+CSV_FIELDS = [
+    "id",
+    "name",
+    "current_party",
+    "current_district",
+    "current_chamber",
+    "given_name",
+    "family_name",
+    "gender",
+    "biography",
+    "birth_date",
+    "death_date",
+    "image",
+    "email",
+    "links",
+    "sources",
+    "capitol_address",
+    "capitol_voice",
+    "capitol_fax",
+    "district_address",
+    "district_voice",
+    "district_fax",
+    "twitter",
+    "youtube",
+    "instagram",
+    "facebook",
+]
+SOCIAL_SCHEMES = ("twitter", "youtube", "instagram", "facebook")
+DATA_TYPES = ("csv", "json")
+
+
+def current_legislators(state):
+    """
+    everyone currently serving in a state's legislature
+
+    the current role is denormalized onto each person so this is a single query
+    plus one per prefetched relation, regardless of the number of legislators
+    """
+    return (
+        Person.objects.filter(current_jurisdiction_id=abbr_to_jid(state))
+        .exclude(current_role=None)
+        .prefetch_related("offices", "identifiers", "links", "sources")
+        .order_by("name", "id")
+    )
+
+
+def _person_to_csv(person):
+    role = person.current_role
+    row = {
+        "id": person.id,
+        "name": person.name,
+        "current_party": person.primary_party,
+        "current_district": role.get("district", ""),
+        "current_chamber": role.get("org_classification", ""),
+        "given_name": person.given_name,
+        "family_name": person.family_name,
+        "gender": person.gender,
+        "biography": person.biography,
+        "birth_date": person.birth_date,
+        "death_date": person.death_date,
+        "image": person.image,
+        "email": person.email,
+        "links": ";".join(link.url for link in person.links.all()),
+        "sources": ";".join(source.url for source in person.sources.all()),
+    }
+    # only the first office of each kind fits in a row, the JSON has them all
+    for office in person.offices.all():
+        if office.classification not in ("capitol", "district"):
+            continue
+        for key in ("address", "voice", "fax"):
+            row.setdefault(f"{office.classification}_{key}", getattr(office, key))
+    for identifier in person.identifiers.all():
+        if identifier.scheme in SOCIAL_SCHEMES:
+            row.setdefault(identifier.scheme, identifier.identifier)
+    return row
+
+
+def _person_to_json(person):
+    return {
+        "id": person.id,
+        "name": person.name,
+        "given_name": person.given_name,
+        "family_name": person.family_name,
+        "gender": person.gender,
+        "biography": person.biography,
+        "birth_date": person.birth_date,
+        "death_date": person.death_date,
+        "image": person.image,
+        "email": person.email,
+        "party": person.primary_party,
+        "current_role": person.current_role,
+        "offices": [
+            {
+                "classification": office.classification,
+                "name": office.display_name,
+                "address": office.address,
+                "voice": office.voice,
+                "fax": office.fax,
+            }
+            for office in person.offices.all()
+        ],
+        "identifiers": [
+            {"scheme": identifier.scheme, "identifier": identifier.identifier}
+            for identifier in person.identifiers.all()
+        ],
+        "links": [{"url": link.url, "note": link.note} for link in person.links.all()],
+        "sources": [
+            {"url": source.url, "note": source.note} for source in person.sources.all()
+        ],
+    }
+
+
+def export_legislators(state, directory, data_types=DATA_TYPES):
+    """
+    write current legislators of a state to <directory>/<state>.<data_type>
+
+    returns a dict mapping data_type to filename, empty if there are none
+    """
+    people = list(current_legislators(state))
+    if not people:
+        print(f"no current legislators for {state}")
+        return {}
+
+    filenames = {}
+    if "csv" in data_types:
+        filenames["csv"] = os.path.join(directory, f"{state}.csv")
+        with open(filenames["csv"], "w") as f:
+            writer = csv.DictWriter(f, CSV_FIELDS, restval="")
+            writer.writeheader()
+            for person in people:
+                writer.writerow(_person_to_csv(person))
+    if "json" in data_types:
+        filenames["json"] = os.path.join(directory, f"{state}.json")
+        with open(filenames["json"], "w") as f:
+            json.dump([_person_to_json(person) for person in people], f)
+    print(f"wrote {len(people)} {state} legislators")
+    return filenames
+
+
+def file_hash(filename):
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def publish_legislators(state, filename, data_type):
+    """
+    upload & record a legislator file, unless it is identical to the last one
+
+    returns True if the file was uploaded
+    """
+    jurisdiction = Jurisdiction.objects.get(id=abbr_to_jid(state))
+    content_hash = file_hash(filename)
+    previous = LegislatorExport.objects.filter(
+        jurisdiction=jurisdiction, data_type=data_type
+    ).first()
+    if previous and previous.content_hash == content_hash:
+        print(f"{state} legislator {data_type} unchanged, skipping upload")
+        return False
+
+    url = upload_file(filename, "people/current/")
+    LegislatorExport.objects.update_or_create(
+        jurisdiction=jurisdiction,
+        data_type=data_type,
+        defaults=dict(url=url, content_hash=content_hash),
+    )
+    return True
+
+
+def export_and_publish(state, data_types=DATA_TYPES):
+    # files are named <state>.<data_type> to match their published urls
+    with tempfile.TemporaryDirectory() as directory:
+        for data_type, filename in export_legislators(
+            state, directory, data_types
+        ).items():
+            publish_legislators(state, filename, data_type)
+
+
+class Command(BaseCommand):
+    help = "export current legislators as CSV & JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("state", help="state abbreviation or 'all'")
+        parser.add_argument("--format", default="csv,json")
+
+    def handle(self, *args, **options):
+        data_types = options["format"].split(",")
+        if not all(data_type in DATA_TYPES for data_type in data_types):
+            raise ValueError("--format must be csv, json, or both")
+
+        if options["state"] == "all":
+            states = [state.abbr.lower() for state in STATES_BY_NAME.values()]
+        else:
+            states = [options["state"].lower()]
+        for state in states:
+            export_and_publish(state, data_types)
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.14 on 2026-10-18 19:11
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0044_bill_citations"),
+        ("bulk", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportManifest",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "data_type",
+                    models.CharField(
+                        choices=[("csv", "csv"), ("json", "json")], max_length=4
+                    ),
+                ),
+                ("high_water_mark", models.DateTimeField(null=True)),
+                (
+                    "bill_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.CharField(max_length=100),
+                        default=list,
+                        size=None,
+                    ),
+                ),
+                (
+                    "vote_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.CharField(max_length=100),
+                        default=list,
+                        size=None,
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="data.legislativesession",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("session", "data_type")},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.14 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bulk", "0002_exportmanifest"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dataexport",
+            name="data_type",
+            field=models.CharField(
+                choices=[("csv", "csv"), ("json", "json"), ("parquet", "parquet")],
+                max_length=7,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="exportmanifest",
+            name="data_type",
+            field=models.CharField(
+                choices=[("csv", "csv"), ("json", "json"), ("parquet", "parquet")],
+                max_length=7,
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.14 on 2026-10-18 19:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bulk", "0003_parquet_data_type"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataexport",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.14 on 2026-10-18 19:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0044_bill_citations"),
+        ("bulk", "0004_dataexport_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LegislatorExport",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "data_type",
+                    models.CharField(
+                        choices=[("csv", "csv"), ("json", "json")], max_length=7
+                    ),
+                ),
+                ("url", models.URLField()),
+                ("content_hash", models.CharField(blank=True, max_length=64)),
+                (
+                    "jurisdiction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="data.jurisdiction",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("jurisdiction", "data_type")},
+            },
+        ),
+    ]
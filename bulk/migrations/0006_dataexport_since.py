@@ -0,0 +1,18 @@
+# Generated by Django 3.2.14 on 2026-10-18 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bulk", "0005_legislatorexport"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataexport",
+            name="since",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
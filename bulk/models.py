@@ -1,13 +1,53 @@
 from django.db import models
-from openstates.data.models import LegislativeSession
+from django.contrib.postgres.fields import ArrayField
+from openstates.data.models import Jurisdiction, LegislativeSession
+
+DATA_TYPE_CHOICES = (("csv", "csv"), ("json", "json"), ("parquet", "parquet"))
+LEGISLATOR_DATA_TYPE_CHOICES = (("csv", "csv"), ("json", "json"))
 
 
 class DataExport(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     session = models.ForeignKey(LegislativeSession, on_delete=models.CASCADE)
-    data_type = models.CharField(
-        max_length=4, choices=(("csv", "csv"), ("json", "json"))
-    )
+    data_type = models.CharField(max_length=7, choices=DATA_TYPE_CHOICES)
     url = models.URLField()
     notes = models.TextField(blank=True)
+    # sha256 of the archive contents (excluding the README), see archive_hash
+    content_hash = models.CharField(max_length=64, blank=True)
+    # set on delta exports, which only contain changes made after it
+    since = models.DateTimeField(null=True, blank=True)
+
+
+class ExportManifest(models.Model):
+    """
+    snapshot of what the last export of a session contained
+
+    delta exports include everything updated after high_water_mark and list
+    ids that have disappeared since as deletions
+    """
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    session = models.ForeignKey(LegislativeSession, on_delete=models.CASCADE)
+    data_type = models.CharField(max_length=7, choices=DATA_TYPE_CHOICES)
+    high_water_mark = models.DateTimeField(null=True)
+    bill_ids = ArrayField(models.CharField(max_length=100), default=list)
+    vote_ids = ArrayField(models.CharField(max_length=100), default=list)
+
+    class Meta:
+        unique_together = ("session", "data_type")
+
+
+class LegislatorExport(models.Model):
+    """current legislators of a jurisdiction, see the legislator_export command"""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    jurisdiction = models.ForeignKey(Jurisdiction, on_delete=models.CASCADE)
+    data_type = models.CharField(max_length=7, choices=LEGISLATOR_DATA_TYPE_CHOICES)
+    url = models.URLField()
+    content_hash = models.CharField(max_length=64, blank=True)
+
+    class Meta:
+        unique_together = ("jurisdiction", "data_type")
@@ -0,0 +1 @@
+from testutils.fixtures import kansas  # noqa
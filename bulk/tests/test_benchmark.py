@@ -0,0 +1,33 @@
+import os
+import pytest
+from openstates.data.models import Bill, PersonVote
+from bulk.management.commands.bulk_export import export_session_json
+from testutils.benchmark import (
+    create_synthetic_jurisdiction,
+    create_synthetic_bills,
+    delete_synthetic_jurisdiction,
+    measure,
+)
+
+
+@pytest.mark.django_db
+def test_create_synthetic_bills():
+    create_synthetic_jurisdiction("zz", "2020")
+    create_synthetic_bills("zz", "2020", bills=30, votes_per_bill=2, voters_per_vote=4)
+    assert Bill.objects.count() == 30
+    assert PersonVote.objects.count() == 30 * 2 * 4
+
+    delete_synthetic_jurisdiction("zz")
+    assert Bill.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_measure_export():
+    create_synthetic_jurisdiction("zz", "2020")
+    create_synthetic_bills("zz", "2020", bills=10)
+    filename, stats = measure(export_session_json, "zz", "2020")
+    os.remove(filename)
+    assert stats["wall_time"] > 0
+    assert stats["peak_rss_mb"] > 0
+    # one query per prefetch, not per bill
+    assert 0 < stats["queries"] < 30
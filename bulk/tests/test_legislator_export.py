@@ -0,0 +1,88 @@
+import csv
+import json
+import pytest
+from openstates.data.models import Organization, Person
+from bulk.management.commands import legislator_export
+from bulk.management.commands.legislator_export import (
+    CSV_FIELDS,
+    export_legislators,
+    export_and_publish,
+)
+from bulk.models import LegislatorExport
+from testutils.factories import create_test_person
+
+
+@pytest.fixture
+def legislators(kansas):
+    upper = Organization.objects.get(classification="upper")
+    lower = Organization.objects.get(classification="lower")
+    amy = create_test_person("Amy Adams", org=upper, district="1", party="Democratic")
+    amy.offices.create(classification="capitol", address="Capitol", voice="555-1234")
+    amy.offices.create(classification="district", address="Home", fax="555-4321")
+    amy.offices.create(classification="district", address="Second Office")
+    amy.identifiers.create(scheme="twitter", identifier="amyadams")
+    amy.links.create(url="https://example.com/amy")
+    amy.sources.create(url="https://example.com/a")
+    amy.sources.create(url="https://example.com/b")
+    create_test_person("Bob Boyd", org=lower, district="2", party="Republican")
+    retired = create_test_person("Carl Cox", org=lower, district="3", party="Green")
+    retired.current_role = None
+    retired.save()
+
+
+@pytest.mark.django_db
+def test_export_legislators(legislators, tmp_path, django_assert_num_queries):
+    # people + offices, identifiers, links & sources no matter how many people
+    with django_assert_num_queries(5):
+        filenames = export_legislators("ks", tmp_path)
+
+    with open(filenames["csv"]) as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0].keys()) == CSV_FIELDS
+    assert [r["name"] for r in rows] == ["Amy Adams", "Bob Boyd"]
+    amy = rows[0]
+    assert amy["current_chamber"] == "upper"
+    assert amy["current_district"] == "1"
+    assert amy["current_party"] == "Democratic"
+    assert amy["capitol_voice"] == "555-1234"
+    assert amy["district_address"] == "Home"
+    assert amy["district_fax"] == "555-4321"
+    assert amy["twitter"] == "amyadams"
+    assert amy["sources"] == "https://example.com/a;https://example.com/b"
+    assert rows[1]["capitol_address"] == ""
+
+    with open(filenames["json"]) as f:
+        people = json.load(f)
+    assert len(people) == 2
+    assert len(people[0]["offices"]) == 3
+    assert people[0]["identifiers"] == [{"scheme": "twitter", "identifier": "amyadams"}]
+    assert people[0]["current_role"]["district"] == "1"
+
+
+@pytest.mark.django_db
+def test_export_legislators_none(kansas, tmp_path):
+    assert export_legislators("ks", tmp_path) == {}
+
+
+@pytest.mark.django_db
+def test_export_and_publish_skips_unchanged(legislators, monkeypatch):
+    uploaded = []
+
+    def fake_upload(filename, s3_path):
+        uploaded.append(filename.rsplit("/", 1)[-1])
+        return f"https://example.com/{s3_path}{uploaded[-1]}"
+
+    monkeypatch.setattr(legislator_export, "upload_file", fake_upload)
+
+    export_and_publish("ks")
+    assert sorted(uploaded) == ["ks.csv", "ks.json"]
+    assert LegislatorExport.objects.get(data_type="csv").url == (
+        "https://example.com/people/current/ks.csv"
+    )
+
+    export_and_publish("ks")
+    assert len(uploaded) == 2
+
+    Person.objects.filter(name="Bob Boyd").update(email="bob@example.com")
+    export_and_publish("ks", ["csv"])
+    assert len(uploaded) == 3
@@ -0,0 +1,29 @@
+import datetime
+import pytest
+from openstates.data.models import LegislativeSession
+from bulk.models import DataExport
+
+
+@pytest.mark.django_db
+def test_bulk_session_list_deltas(kansas, client, django_user_model):
+    session = LegislativeSession.objects.get(identifier="2020")
+    DataExport.objects.create(
+        session=session, data_type="csv", url="https://example.com/latest.zip"
+    )
+    DataExport.objects.create(
+        session=session,
+        data_type="csv",
+        url="https://example.com/delta.zip",
+        since=datetime.datetime(2021, 3, 4, 5, 6, tzinfo=datetime.timezone.utc),
+    )
+    user = django_user_model.objects.create_user("user", password="pw")
+    client.force_login(user)
+
+    response = client.get("/data/session-csv/")
+    assert response.status_code == 200
+    exports = list(response.context["exports"])
+    assert len(exports) == 1
+    assert [d.url for d in exports[0].deltas] == ["https://example.com/delta.zip"]
+    content = response.content.decode()
+    assert "https://example.com/delta.zip" in content
+    assert "changes since 2021-03-04 05:06" in content
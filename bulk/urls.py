@@ -7,4 +7,5 @@ urlpatterns = [
     path("geo/", views.geo),
     path("session-csv/", views.bulk_session_list, {"data_type": "csv"}),
     path("session-json/", views.bulk_session_list, {"data_type": "json"}),
+    path("session-parquet/", views.bulk_session_list, {"data_type": "parquet"}),
 ]
@@ -22,10 +22,18 @@ def bulk_session_list(request, data_type):
     if request.user.is_anonymous:
         messages.warning(request, "Please log in to access download links.")
     exports = (
-        DataExport.objects.filter(data_type=data_type)
+        DataExport.objects.filter(data_type=data_type, since__isnull=True)
         .select_related("session", "session__jurisdiction")
         .order_by("session__jurisdiction__name", "session__name")
     )
+    # each session's delta exports are listed under its full export
+    deltas = {}
+    for delta in DataExport.objects.filter(
+        data_type=data_type, since__isnull=False
+    ).order_by("-since"):
+        deltas.setdefault(delta.session_id, []).append(delta)
+    for export in exports:
+        export.deltas = deltas.get(export.session_id, [])
     return render(
         request,
         "bulk/bulk_session_list.html",
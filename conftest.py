@@ -0,0 +1,10 @@
+import pytest
+from utils.metadata import registry
+
+
+@pytest.fixture(autouse=True)
+def clear_metadata_registry():
+    # each test's data is rolled back without any signals
+    registry.invalidate()
+    yield
+    registry.invalidate()
@@ -0,0 +1,3 @@
+#!/bin/sh
+
+poetry run ./manage.py refresh_current_memberships
@@ -1,6 +1,17 @@
+import json
+import datetime
 import graphene
+from functools import partial
 from collections import Iterable
-from graphql_relay.connection.arrayconnection import connection_from_list_slice
+from graphene.types import NonNull
+from graphene.utils.thenables import maybe_thenable
+from graphql_relay.connection.arrayconnection import (
+    connection_from_list_slice,
+    get_offset_with_default,
+)
+from graphql_relay.utils import base64, unbase64
+from django.db.models import Q
+from .optimization import get_field_names
 
 
 class OCDBaseNode(graphene.ObjectType):
@@ -27,9 +38,55 @@ class NameNode(graphene.ObjectType):
     end_date = graphene.String()
 
 
+KEYSET_CURSOR_PREFIX = "keyset:"
+
+
+def keyset_cursor(node, keyset):
+    values = [getattr(node, field.lstrip("-")) for field in keyset]
+    values = [v.isoformat() if isinstance(v, datetime.datetime) else v for v in values]
+    return base64(KEYSET_CURSOR_PREFIX + json.dumps(values))
+
+
+def parse_keyset_cursor(cursor):
+    """values in a keyset cursor, None if it is an (older) offset cursor"""
+    try:
+        cursor = unbase64(cursor)
+    except Exception:
+        return None
+    if not cursor.startswith(KEYSET_CURSOR_PREFIX):
+        return None
+    return json.loads(cursor[len(KEYSET_CURSOR_PREFIX) :])
+
+
+def _keyset_filter(keyset, values, beyond):
+    """
+    filter for rows that come after (beyond=True) or before values in keyset order
+
+    i.e. (a, b) > (x, y) expanded into a > x OR (a = x AND b > y)
+    """
+    q = Q()
+    for n, field in enumerate(keyset):
+        op = "lt" if field.startswith("-") == beyond else "gt"
+        equal = {f.lstrip("-"): v for f, v in zip(keyset[:n], values[:n])}
+        q |= Q(**equal, **{f"{field.lstrip('-')}__{op}": values[n]})
+    return q
+
+
 class DjangoConnectionField(graphene.relay.ConnectionField):
     @classmethod
-    def resolve_connection(cls, connection_type, args, resolved):
+    def connection_resolver(cls, resolver, connection_type, root, info, **args):
+        resolved = resolver(root, info, **args)
+
+        if isinstance(connection_type, NonNull):
+            connection_type = connection_type.of_type
+
+        # paging forwards, totalCount is the only thing that needs a COUNT(*)
+        count = ".totalCount" in get_field_names(info)
+        on_resolve = partial(cls.resolve_connection, connection_type, args, count=count)
+        return maybe_thenable(resolved, on_resolve)
+
+    @classmethod
+    def resolve_connection(cls, connection_type, args, resolved, count=True):
         if isinstance(resolved, connection_type):
             return resolved
 
@@ -48,11 +105,32 @@ class DjangoConnectionField(graphene.relay.ConnectionField):
                     )
                 )
 
-        if isinstance(resolved, list):
+        first = args.get("first")
+        if cls._use_keyset(connection_type, args, resolved):
+            return cls._resolve_keyset(connection_type, args, resolved)
+        elif isinstance(resolved, list):
             _len = len(resolved)
-        else:
+        elif count or not isinstance(first, int) or args.get("last") is not None:
             # Django QuerySet
             _len = resolved.count()
+        else:
+            # fetch one extra row to tell whether there's a next page instead
+            # of counting, as far as the slicing is concerned the list ends there
+            start = get_offset_with_default(args.get("after"), -1) + 1
+            page = list(resolved[start : start + first + 1])
+            connection = connection_from_list_slice(
+                list_slice=page,
+                args=args,
+                connection_type=connection_type,
+                edge_type=connection_type.Edge,
+                pageinfo_type=graphene.relay.PageInfo,
+                slice_start=start,
+                list_length=start + len(page),
+                list_slice_length=len(page),
+            )
+            connection.iterable = resolved
+            connection._len = None
+            return connection
 
         connection = connection_from_list_slice(
             list_slice=resolved,
@@ -68,6 +146,68 @@ class DjangoConnectionField(graphene.relay.ConnectionField):
         connection._len = _len
         return connection
 
+    @classmethod
+    def _use_keyset(cls, connection_type, args, resolved):
+        if not getattr(connection_type, "keyset", None) or isinstance(resolved, list):
+            return False
+        if (args.get("first") is None) == (args.get("last") is None):
+            return False
+        # offset cursors handed out before keyset pagination keep working
+        return all(
+            parse_keyset_cursor(args[arg]) is not None
+            for arg in ("after", "before")
+            if args.get(arg)
+        )
+
+    @classmethod
+    def _resolve_keyset(cls, connection_type, args, resolved):
+        """
+        page through resolved ordered by connection_type.keyset, with cursors holding
+        the keyset values of their node
+
+        unlike OFFSET the cost of a page doesn't depend on how deep into the results it is
+        """
+        keyset = connection_type.keyset
+        first = args.get("first")
+        last = args.get("last")
+        resolved = resolved.order_by(*keyset)
+
+        page = resolved
+        if args.get("after"):
+            values = parse_keyset_cursor(args["after"])
+            page = page.filter(_keyset_filter(keyset, values, True))
+        if args.get("before"):
+            values = parse_keyset_cursor(args["before"])
+            page = page.filter(_keyset_filter(keyset, values, False))
+
+        # fetch an extra node to tell whether there is another page
+        has_next_page = has_previous_page = False
+        if first is not None:
+            nodes = list(page[: first + 1])
+            has_next_page = len(nodes) > first
+            nodes = nodes[:first]
+        else:
+            nodes = list(page.reverse()[: last + 1])
+            has_previous_page = len(nodes) > last
+            nodes = nodes[:last][::-1]
+
+        edges = [
+            connection_type.Edge(node=node, cursor=keyset_cursor(node, keyset))
+            for node in nodes
+        ]
+        connection = connection_type(
+            edges=edges,
+            page_info=graphene.relay.PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+            ),
+        )
+        connection.iterable = resolved
+        connection._len = None
+        return connection
+
 
 class CountableConnectionBase(graphene.relay.Connection):
     class Meta:
@@ -7,9 +7,9 @@ from openstates.data.models import (
     Person,
     Membership,
     LegislativeSession,
-    RunPlan,
 )
 from utils.geo import coords_to_divisions
+from utils.metadata import registry
 from .common import (
     OCDBaseNode,
     IdentifierNode,
@@ -19,6 +19,7 @@ from .common import (
     CountableConnectionBase,
 )
 from .optimization import optimize
+from .loaders import load_related, get_last_scraped_loader
 
 
 def _resolve_suborganizations(root_obj, field_name, classification=None):
@@ -54,13 +55,11 @@ def _resolve_suborganizations(root_obj, field_name, classification=None):
 def _membership_filter(
     qs, info, classification=None, prefix=None, current=False, coming_from_person=True
 ):
-    today = datetime.date.today().isoformat()
     if current:
-        qs = qs.filter(
-            Q(start_date="") | Q(start_date__lte=today),
-            Q(end_date="") | Q(end_date__gte=today),
-        )
+        # current memberships are precomputed by CurrentMembership.refresh()
+        qs = qs.filter(current__isnull=False)
     else:
+        today = datetime.date.today().isoformat()
         qs = qs.filter(
             Q(start_date__gte=today) | (Q(end_date__lte=today) & ~Q(end_date=""))
         )
@@ -176,16 +175,16 @@ class PersonNode(OCDBaseNode):
     votes = DjangoConnectionField("graphapi.legislative.BillVoteConnection")
 
     def resolve_identifiers(self, info):
-        return self.identifiers.all()
+        return load_related(self, info, "identifiers")
 
     def resolve_other_names(self, info):
-        return self.other_names.all()
+        return load_related(self, info, "other_names")
 
     def resolve_links(self, info):
-        return self.links.all()
+        return load_related(self, info, "links")
 
     def resolve_sources(self, info):
-        return self.sources.all()
+        return load_related(self, info, "sources")
 
     def resolve_contact_details(self, info):
         contact_details = []
@@ -204,7 +203,7 @@ class PersonNode(OCDBaseNode):
         return contact_details
 
     def resolve_offices(self, info):
-        return self.offices.all()
+        return load_related(self, info, "offices")
 
     def resolve_current_memberships(self, info, classification=None):
         if hasattr(self, "current_memberships"):
@@ -295,10 +294,7 @@ class JurisdictionNode(graphene.ObjectType):
         return _resolve_suborganizations(self, "organizations", classification)
 
     def resolve_last_scraped_at(self, info):
-        try:
-            return self.runs.filter(success=True).latest("end_time").end_time
-        except RunPlan.DoesNotExist:
-            return None
+        return get_last_scraped_loader(info).load(self.id)
 
 
 class JurisdictionConnection(graphene.relay.Connection):
@@ -311,6 +307,7 @@ class PersonConnection(CountableConnectionBase):
         node = PersonNode
 
     max_items = 100
+    keyset = ("name", "id")
 
 
 class CoreQuery:
@@ -362,9 +359,9 @@ class CoreQuery:
 
     def resolve_jurisdiction(self, info, id=None, name=None):
         if id:
-            return Jurisdiction.objects.get(id=id)
+            return registry.jurisdiction(id=id)
         if name:
-            return Jurisdiction.objects.get(name=name)
+            return registry.jurisdiction(name=name)
         else:
             raise ValueError("Jurisdiction requires id or name")
 
@@ -385,17 +382,13 @@ class CoreQuery:
         longitude=None,
     ):
         qs = Person.objects.all()
-        today = datetime.date.today()
 
         if name:
             qs = qs.filter(
                 Q(name__icontains=name) | Q(other_names__name__icontains=name)
             )
         if division_id:
-            qs = qs.filter(
-                Q(memberships__post__division_id=division_id),
-                Q(memberships__end_date="") | Q(memberships__end_date__gt=today),
-            )
+            qs = qs.filter(current_membership_set__division_id=division_id)
         if member_of:
             qs = qs.member_of(member_of, post=district)
         if ever_member_of:
@@ -416,10 +409,7 @@ class CoreQuery:
                 raise ValueError("invalid lat or lon")
 
             divisions = coords_to_divisions(latitude, longitude)
-            qs = qs.filter(
-                Q(memberships__post__division__id__in=divisions),
-                Q(memberships__end_date="") | Q(memberships__end_date__gt=today),
-            )
+            qs = qs.filter(current_membership_set__division_id__in=divisions)
 
         elif latitude or longitude:
             raise ValueError("must provide lat & lon together")
@@ -469,4 +459,8 @@ class CoreQuery:
         return Person.objects.get(pk=id)
 
     def resolve_organization(self, info, id):
-        return optimize(Organization.objects, info, None, [".parent"]).get(pk=id)
+        # chambers (and their parents) are kept by the registry
+        org = registry.organization(id)
+        if org is None:
+            org = optimize(Organization.objects, info, None, [".parent"]).get(pk=id)
+        return org
@@ -0,0 +1,60 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import partial
+from graphql import parse, validate, execute
+from graphql.backend.base import GraphQLBackend, GraphQLDocument
+from graphql.execution import ExecutionResult
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode("utf8")).hexdigest()
+
+
+def _invalid(errors, *args, **kwargs):
+    return ExecutionResult(errors=errors, invalid=True)
+
+
+class CachedDocumentBackend(GraphQLBackend):
+    """
+    parses & validates each distinct query once
+
+    the max_size most recently used documents are kept, keyed on the sha256 of
+    their text so they line up with persisted query hashes
+
+    valid documents are run with execute(schema, document_ast, **options)
+    """
+
+    def __init__(self, max_size=256, execute=execute):
+        self.max_size = max_size
+        self.execute = execute
+        self.documents = OrderedDict()
+        self.lock = threading.Lock()
+
+    def document_from_string(self, schema, request_string):
+        key = (schema, query_hash(request_string))
+        with self.lock:
+            document = self.documents.get(key)
+            if document is not None:
+                self.documents.move_to_end(key)
+                return document
+
+        # syntax errors are raised & not cached
+        document_ast = parse(request_string)
+        errors = validate(schema, document_ast)
+        if errors:
+            run = partial(_invalid, errors)
+        else:
+            run = partial(self.execute, schema, document_ast)
+        document = GraphQLDocument(
+            schema=schema,
+            document_string=request_string,
+            document_ast=document_ast,
+            execute=run,
+        )
+
+        with self.lock:
+            self.documents[key] = document
+            if len(self.documents) > self.max_size:
+                self.documents.popitem(last=False)
+        return document
@@ -0,0 +1,152 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, connection
+from graphql import GraphQLError, execute
+from graphql.execution import ExecutionResult
+from graphql.language.ast import (
+    Document,
+    Field,
+    FragmentDefinition,
+    OperationDefinition,
+    SelectionSet,
+)
+from graphql.utils.get_operation_ast import get_operation_ast
+from .middleware import QueryCostException, QueryProtectionMiddleware
+
+# shared by every request, each of its threads keeps its own database connection
+root_field_pool = ThreadPoolExecutor(
+    max_workers=settings.GRAPHQL_ROOT_FIELD_WORKERS, thread_name_prefix="graphql"
+)
+
+
+def split_operation(document_ast, operation):
+    """
+    one document per root field of operation, sharing its fragments
+
+    selections with the same response key are kept together so that graphql
+    merges them as usual, None if there's only one root field or the root uses
+    fragments
+    """
+    groups = {}
+    for selection in operation.selection_set.selections:
+        if not isinstance(selection, Field):
+            return None
+        key = (selection.alias or selection.name).value
+        groups.setdefault(key, []).append(selection)
+    if len(groups) < 2:
+        return None
+
+    fragments = [
+        d for d in document_ast.definitions if isinstance(d, FragmentDefinition)
+    ]
+    return [
+        Document(
+            definitions=[
+                OperationDefinition(
+                    operation=operation.operation,
+                    name=operation.name,
+                    variable_definitions=operation.variable_definitions,
+                    directives=operation.directives,
+                    selection_set=SelectionSet(selections=selections),
+                )
+            ]
+            + fragments
+        )
+        for selections in groups.values()
+    ]
+
+
+def _close_old_connections():
+    # never mid-transaction, e.g. when run in the calling thread
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def _execute_root_field(schema, document_ast, context_value, **options):
+    _close_old_connections()
+    try:
+        trace = getattr(context_value, "graphql_trace", None)
+        if trace is None:
+            return execute(schema, document_ast, context_value=context_value, **options)
+        # the trace only counts queries on the connection it was started on
+        with connection.execute_wrapper(trace.count_query):
+            return execute(schema, document_ast, context_value=context_value, **options)
+    finally:
+        _close_old_connections()
+
+
+def execute_concurrently(
+    schema, document_ast, context_value=None, operation_name=None, **options
+):
+    """
+    execute(), but with each root field of a query resolved in its own thread
+    from root_field_pool & the results merged in order
+
+    every root field gets a shallow copy of the context so that per-operation
+    state like loaders isn't shared between threads, the cost of the whole
+    operation is worked out beforehand so it is still one budget, rejected with a
+    single error when it is over
+    """
+    operation = get_operation_ast(document_ast, operation_name)
+    documents = None
+    if operation is not None and operation.operation == "query":
+        documents = split_operation(document_ast, operation)
+    if documents is None:
+        return execute(
+            schema,
+            document_ast,
+            context_value=context_value,
+            operation_name=operation_name,
+            **options,
+        )
+
+    fragments = {
+        d.name.value: d
+        for d in document_ast.definitions
+        if isinstance(d, FragmentDefinition)
+    }
+    for middleware in options.get("middleware") or []:
+        if isinstance(middleware, QueryProtectionMiddleware):
+            budget = middleware.budget(
+                schema, operation, fragments, options.get("variable_values")
+            )
+            if context_value is not None:
+                context_value.graphql_cost = budget
+            try:
+                middleware.check(budget)
+            except QueryCostException as e:
+                # rejected once here rather than by every root field's thread
+                keys = [
+                    (selection.alias or selection.name).value
+                    for selection in operation.selection_set.selections
+                ]
+                return ExecutionResult(
+                    data=dict.fromkeys(keys), errors=[GraphQLError(str(e))]
+                )
+
+    futures = [
+        root_field_pool.submit(
+            _execute_root_field,
+            schema,
+            document,
+            copy.copy(context_value),
+            operation_name=operation_name,
+            **options,
+        )
+        for document in documents
+    ]
+
+    data = {}
+    errors = []
+    for future in futures:
+        result = future.result()
+        # e.g. bad variables, which every root field would complain about
+        if result.invalid:
+            return result
+        errors.extend(result.errors or [])
+        if data is not None and result.data is not None:
+            data.update(result.data)
+        else:
+            data = None
+    return ExecutionResult(data=data, errors=errors or None)
@@ -1,6 +1,6 @@
 import graphene
 import re
-from django.db.models import Prefetch
+from django.db.models import Prefetch, Q
 from openstates.data.models import Bill, BillActionRelatedEntity, PersonVote
 from openstates.utils.transformers import fix_bill_id
 from .common import OCDBaseNode, DjangoConnectionField, CountableConnectionBase
@@ -12,11 +12,16 @@ from .core import (
     LinkNode,
 )
 from .optimization import optimize
+from .loaders import load_related
 from urllib.parse import urlparse
 from utils.common import abbr_to_jid
 from utils.bills import search_bills
 
 
+# most bills that can be looked up with a single billsByIds
+MAX_BILLS_BY_IDS = 100
+
+
 def jurisdiction_query(jurisdiction):
     query = {}
     if jurisdiction.startswith("ocd-jurisdiction"):
@@ -93,7 +98,7 @@ class BillDocumentNode(graphene.ObjectType):
     links = graphene.List(MimetypeLinkNode)
 
     def resolve_links(self, info):
-        return self.links.all()
+        return load_related(self, info, "links")
 
 
 class BillNode(OCDBaseNode):
@@ -120,13 +125,13 @@ class BillNode(OCDBaseNode):
     openstates_url = graphene.String()
 
     def resolve_abstracts(self, info):
-        return self.abstracts.all()
+        return load_related(self, info, "abstracts")
 
     def resolve_other_titles(self, info):
-        return self.other_titles.all()
+        return load_related(self, info, "other_titles")
 
     def resolve_other_identifiers(self, info):
-        return self.other_identifiers.all()
+        return load_related(self, info, "other_identifiers")
 
     def resolve_actions(self, info):
         if "actions" not in getattr(self, "_prefetched_objects_cache", []):
@@ -150,7 +155,7 @@ class BillNode(OCDBaseNode):
             return self.actions.all()
 
     def resolve_sponsorships(self, info):
-        return self.sponsorships.all()
+        return load_related(self, info, "sponsorships")
 
     def resolve_documents(self, info):
         if "documents" not in getattr(self, "_prefetched_objects_cache", []):
@@ -165,7 +170,7 @@ class BillNode(OCDBaseNode):
             return self.versions.all()
 
     def resolve_sources(self, info):
-        return self.sources.all()
+        return load_related(self, info, "sources")
 
     def resolve_votes(self, info, first=None, last=None, before=None, after=None):
         if "votes" not in getattr(self, "_prefetched_objects_cache", []):
@@ -203,6 +208,7 @@ class BillConnection(CountableConnectionBase):
         node = BillNode
 
     max_items = 100
+    keyset = ("-updated_at", "-id")
 
 
 class VoteCountNode(graphene.ObjectType):
@@ -246,13 +252,13 @@ class VoteEventNode(OCDBaseNode):
     sources = graphene.List(LinkNode)
 
     def resolve_votes(self, info):
-        return self.votes.all()
+        return load_related(self, info, "votes")
 
     def resolve_counts(self, info):
-        return self.counts.all()
+        return load_related(self, info, "counts")
 
     def resolve_sources(self, info):
-        return self.sources.all()
+        return load_related(self, info, "sources")
 
 
 class VoteConnection(graphene.relay.Connection):
@@ -265,6 +271,56 @@ class BillVoteConnection(graphene.relay.Connection):
         node = BillVoteNode
 
 
+def _optimize_bills(bills, info):
+    """prefetch & select everything the selected BillNode fields need"""
+    return optimize(
+        bills,
+        info,
+        [
+            ".abstracts",
+            ".otherTitles",
+            ".otherIdentifiers",
+            ".fromOrganization",
+            ".actions",
+            ".actions.organization",
+            ".actions.relatedEntities",
+            ".actions.relatedEntities.organization",
+            ".actions.relatedEntities.person",
+            ".actions.vote",
+            ".sponsorships",
+            ".documents",
+            ".versions",
+            ".documents.links",
+            ".versions.links",
+            ".sources",
+            ".relatedBills",
+            ".votes",
+            ".votes.counts",
+            (
+                ".votes.votes",
+                Prefetch(
+                    "votes__votes", PersonVote.objects.all().select_related("voter")
+                ),
+            ),
+        ],
+        [".legislativeSession" ".legislativeSession.jurisdiction"],
+    )
+
+
+def _parse_openstates_url(url):
+    """(jurisdiction id, session, identifier) of a bill's openstates.org url"""
+    # remove domain, start and end slashes
+    path = urlparse(url).path.strip("/")
+
+    # parse openstatesUrl into state abbr, session, and bill_id
+    m = re.match(r"(?P<abbr>\w+)/bills/(?P<session>.+)/(?P<bill_id>.+)", path)
+    if not m:
+        raise ValueError(
+            "Unable to parse openstatesUrl. openstatesUrl may be malformed."
+        )
+    return abbr_to_jid(m["abbr"]), m["session"], fix_bill_id(m["bill_id"])
+
+
 class SponsorInput(graphene.InputObjectType):
     name = graphene.String(required=False)
     primary = graphene.Boolean(required=False)
@@ -292,6 +348,11 @@ class LegislativeQuery:
         action_since=graphene.String(),
         search_query=graphene.String(),
     )
+    bills_by_ids = graphene.List(
+        BillNode,
+        ids=graphene.List(graphene.String),
+        openstatesUrls=graphene.List(graphene.String),
+    )
 
     def resolve_bills(
         self,
@@ -339,40 +400,44 @@ class LegislativeQuery:
                 sponsor_args["sponsorships__name"] = sponsor["name"]
             bills = bills.filter(**sponsor_args)
 
-        bills = optimize(
-            bills,
-            info,
-            [
-                ".abstracts",
-                ".otherTitles",
-                ".otherIdentifiers",
-                ".fromOrganization",
-                ".actions",
-                ".actions.organization",
-                ".actions.relatedEntities",
-                ".actions.relatedEntities.organization",
-                ".actions.relatedEntities.person",
-                ".actions.vote",
-                ".sponsorships",
-                ".documents",
-                ".versions",
-                ".documents.links",
-                ".versions.links",
-                ".sources",
-                ".relatedBills",
-                ".votes",
-                ".votes.counts",
-                (
-                    ".votes.votes",
-                    Prefetch(
-                        "votes__votes", PersonVote.objects.all().select_related("voter")
-                    ),
-                ),
-            ],
-            [".legislativeSession" ".legislativeSession.jurisdiction"],
+        return _optimize_bills(bills, info)
+
+    def resolve_bills_by_ids(self, info, ids=None, openstatesUrls=None):
+        """
+        bills in the order they were asked for, with null for any that don't exist
+
+        every lookup is done by a single query, optimized like bills
+        """
+        ids = ids or []
+        urls = [_parse_openstates_url(url) for url in openstatesUrls or []]
+        if not ids and not urls:
+            raise ValueError("must pass 'ids' or 'openstatesUrls'")
+        if len(ids) + len(urls) > MAX_BILLS_BY_IDS:
+            raise ValueError(
+                f"can only look up {MAX_BILLS_BY_IDS} bills at a time, "
+                f"got {len(ids) + len(urls)}"
+            )
+
+        query = Q(id__in=ids)
+        for jid, session, identifier in urls:
+            query |= Q(
+                legislative_session__jurisdiction_id=jid,
+                legislative_session__identifier=session,
+                identifier=identifier,
+            )
+        bills = _optimize_bills(
+            Bill.objects.filter(query).select_related("legislative_session"), info
         )
 
-        return bills
+        by_id = {}
+        by_url = {}
+        for bill in bills:
+            by_id[bill.id] = bill
+            session = bill.legislative_session
+            by_url[
+                (session.jurisdiction_id, session.identifier, bill.identifier)
+            ] = bill
+        return [by_id.get(id) for id in ids] + [by_url.get(url) for url in urls]
 
     def resolve_bill(
         self,
@@ -392,32 +457,19 @@ class LegislativeQuery:
         if id:
             bill = Bill.objects.get(id=id)
         if openstatesUrl:
-            # remove domain, start and end slashes
-            path = urlparse(openstatesUrl).path.strip("/")
-
-            # parse openstatesUrl into state abbr, session, and bill_id
-            m = re.match(r"(?P<abbr>\w+)/bills/(?P<session>.+)/(?P<bill_id>.+)", path)
-
-            if m:
-                jid = abbr_to_jid(m["abbr"])
-                identifier = fix_bill_id(m["bill_id"])
-                session = m["session"]
-
-                # query Bill with components
-                # (this bit taken from def bill in views/bills.py)
-                bill = Bill.objects.select_related(
-                    "legislative_session",
-                    "legislative_session__jurisdiction",
-                    "from_organization",
-                ).get(
-                    legislative_session__jurisdiction_id=jid,
-                    legislative_session__identifier=session,
-                    identifier=identifier,
-                )
-            else:
-                raise ValueError(
-                    "Unable to parse openstatesUrl. openstatesUrl may be malformed."
-                )
+            jid, session, identifier = _parse_openstates_url(openstatesUrl)
+
+            # query Bill with components
+            # (this bit taken from def bill in views/bills.py)
+            bill = Bill.objects.select_related(
+                "legislative_session",
+                "legislative_session__jurisdiction",
+                "from_organization",
+            ).get(
+                legislative_session__jurisdiction_id=jid,
+                legislative_session__identifier=session,
+                identifier=identifier,
+            )
 
         if not bill:
             raise ValueError(
@@ -0,0 +1,92 @@
+from collections import defaultdict
+from django.core.cache import caches
+from django.db.models import Max
+from promise import Promise
+from promise.dataloader import DataLoader
+from openstates.data.models import RunPlan
+
+# scrapes finish a few times a day at most
+LAST_SCRAPED_TIMEOUT = 5 * 60
+
+
+class RelatedLoader(DataLoader):
+    """
+    loads the reverse side of a foreign key (e.g. Bill.abstracts) for many parents
+    with a single IN (...) query
+    """
+
+    def __init__(self, model, field_name):
+        super().__init__()
+        descriptor = getattr(model, field_name)
+        self.fk = descriptor.field
+        self.queryset = descriptor.rel.related_model.objects.all()
+
+    def batch_load_fn(self, keys):
+        grouped = defaultdict(list)
+        for obj in self.queryset.filter(**{f"{self.fk.name}__in": keys}):
+            grouped[getattr(obj, self.fk.attname)].append(obj)
+        return Promise.resolve([grouped[key] for key in keys])
+
+
+class LastScrapedLoader(DataLoader):
+    """
+    loads when each jurisdiction was last successfully scraped, with one grouped
+    query for every jurisdiction that isn't in the cache
+    """
+
+    def batch_load_fn(self, keys):
+        cache = caches["default"]
+        cache_keys = {key: f"last-scraped~{key}" for key in keys}
+        cached = cache.get_many(cache_keys.values())
+
+        missing = [key for key in keys if cache_keys[key] not in cached]
+        if missing:
+            latest = dict(
+                RunPlan.objects.filter(jurisdiction_id__in=missing, success=True)
+                .values_list("jurisdiction_id")
+                .annotate(Max("end_time"))
+            )
+            found = {cache_keys[key]: latest.get(key) for key in missing}
+            cache.set_many(found, LAST_SCRAPED_TIMEOUT)
+            cached.update(found)
+
+        return Promise.resolve([cached[cache_keys[key]] for key in keys])
+
+
+def _get_loaders(info):
+    """
+    loaders live on the context so that they are shared by every node in a
+    request (and no further), without a context nothing can be batched
+    """
+    loaders = getattr(info.context, "graphql_loaders", None)
+    if loaders is None:
+        loaders = {}
+        if info.context is not None:
+            info.context.graphql_loaders = loaders
+    return loaders
+
+
+def get_loader(info, model, field_name):
+    """get the request's loader for model.field_name"""
+    loaders = _get_loaders(info)
+    key = (model, field_name)
+    if key not in loaders:
+        loaders[key] = RelatedLoader(model, field_name)
+    return loaders[key]
+
+
+def get_last_scraped_loader(info):
+    loaders = _get_loaders(info)
+    if LastScrapedLoader not in loaders:
+        loaders[LastScrapedLoader] = LastScrapedLoader()
+    return loaders[LastScrapedLoader]
+
+
+def load_related(root, info, field_name):
+    """
+    resolve root.<field_name>.all(), from the prefetch cache if optimize() filled it
+    and otherwise batched together with the same relation on sibling nodes
+    """
+    if field_name in getattr(root, "_prefetched_objects_cache", []):
+        return getattr(root, field_name).all()
+    return get_loader(info, type(root), field_name).load(root.pk)
@@ -1,5 +1,9 @@
+import json
 import logging
-from graphql.language.ast import FragmentSpread, Variable
+import threading
+from collections import OrderedDict
+from graphql.language.ast import FragmentSpread, InlineFragment, Variable
+from graphql.type import GraphQLList, GraphQLNonNull
 
 
 class QueryCostException(Exception):
@@ -8,49 +12,229 @@ class QueryCostException(Exception):
 
 log = logging.getLogger("graphapi")
 
+# how many items a list, or a connection without first/last, is assumed to hold
+# roughly what the data averages, since a page is charged as if every item had
+# this many
+LIST_SIZES = {
+    "Query.jurisdictions": 52,
+    # charged as if every call looked up as many bills as it is allowed to
+    "Query.billsByIds": 100,
+    "JurisdictionNode.legislativeSessions": 20,
+    "BillNode.abstracts": 1,
+    "BillNode.otherTitles": 1,
+    "BillNode.otherIdentifiers": 1,
+    "BillNode.actions": 10,
+    "BillNode.sponsorships": 5,
+    "BillNode.relatedBills": 2,
+    "BillNode.documents": 2,
+    "BillNode.versions": 2,
+    "BillNode.sources": 2,
+    "BillNode.votes": 5,
+    "BillActionNode.relatedEntities": 1,
+    "BillDocumentNode.links": 1,
+    "VoteEventNode.votes": 100,
+    "VoteEventNode.counts": 3,
+    "VoteEventNode.sources": 1,
+    "OrganizationNode.links": 1,
+    "OrganizationNode.sources": 1,
+    "PersonNode.votes": 100,
+    "PersonNode.links": 2,
+    "PersonNode.sources": 2,
+    "PersonNode.contactDetails": 5,
+    "PersonNode.offices": 3,
+    "PersonNode.currentMemberships": 3,
+}
+DEFAULT_LIST_SIZE = 10
 
-def _get_counts(info, fragments, variable_values):
-    multiplier = 1
-    inner_multiplier = 0
+# cost of resolving a field once, by TypeName.fieldName or just fieldName
+# otherwise each item of a list, connection & root field costs 1, while other
+# objects & scalars come along with their parent (joined or loaded in one
+# batch per level) and cost nothing
+FIELD_WEIGHTS = {
+    "totalCount": 1,
+    "JurisdictionNode.lastScrapedAt": 1,
+    "BillNode.openstatesUrl": 0,
+}
 
-    if isinstance(info, FragmentSpread):
-        for selection in fragments[info.name.value].selection_set.selections:
-            inner_multiplier += _get_counts(selection, fragments, variable_values)
-    else:
-        # the multiplier is either 1 or the number of elements returned
-        for argument in info.arguments:
-            if argument.name.value in ("first", "last"):
-                if isinstance(argument.value, Variable):
-                    multiplier = variable_values[argument.value.name.value]
-                else:
-                    multiplier = int(argument.value.value)
 
-        # count up how many multi-nodes inside
-        if info.selection_set:
-            for selection in info.selection_set.selections:
-                inner_multiplier += _get_counts(selection, fragments, variable_values)
+def _unwrap(graphql_type):
+    is_list = False
+    while isinstance(graphql_type, (GraphQLList, GraphQLNonNull)):
+        is_list = is_list or isinstance(graphql_type, GraphQLList)
+        graphql_type = graphql_type.of_type
+    return graphql_type, is_list
 
-    # if this wasn't a multi-node, this counts as one node
-    if inner_multiplier == 0:
-        inner_multiplier = 1
 
-    return multiplier * inner_multiplier
+def _page_size(field, variable_values):
+    for argument in field.arguments:
+        if argument.name.value in ("first", "last"):
+            if isinstance(argument.value, Variable):
+                return variable_values.get(argument.value.name.value)
+            return int(argument.value.value)
+    return None
+
+
+def _selection_cost(
+    schema, parent_type, selection_set, fragments, variable_values, multiplier, page
+):
+    """
+    cost of a selection set resolved multiplier times
+
+    page is the size of the page when parent_type is a connection
+    """
+    cost = 0
+    for selection in selection_set.selections:
+        if isinstance(selection, FragmentSpread):
+            fragment = fragments[selection.name.value]
+            fragment_type = schema.get_type(fragment.type_condition.name.value)
+            cost += _selection_cost(
+                schema,
+                fragment_type,
+                fragment.selection_set,
+                fragments,
+                variable_values,
+                multiplier,
+                page,
+            )
+            continue
+        if isinstance(selection, InlineFragment):
+            fragment_type = parent_type
+            if selection.type_condition:
+                fragment_type = schema.get_type(selection.type_condition.name.value)
+            cost += _selection_cost(
+                schema,
+                fragment_type,
+                selection.selection_set,
+                fragments,
+                variable_values,
+                multiplier,
+                page,
+            )
+            continue
+
+        # aliases are separate selections, so each is counted on its own
+        name = selection.name.value
+        if name.startswith("__"):
+            continue
+        key = f"{parent_type.name}.{name}"
+        field_type, is_list = _unwrap(parent_type.fields[name].type)
+        weight = FIELD_WEIGHTS.get(key, FIELD_WEIGHTS.get(name))
+        if not selection.selection_set:
+            cost += multiplier * (weight or 0)
+            continue
+        is_connection = "edges" in getattr(field_type, "fields", {})
+        if weight is None:
+            is_root = parent_type is schema.get_query_type()
+            weight = 1 if is_list or is_connection or is_root else 0
+
+        count = multiplier
+        if is_list:
+            size = page if name == "edges" else None
+            count *= size or LIST_SIZES.get(key, DEFAULT_LIST_SIZE)
+        cost += count * weight
+
+        inner_page = None
+        if is_connection:
+            inner_page = _page_size(selection, variable_values) or LIST_SIZES.get(
+                key, DEFAULT_LIST_SIZE
+            )
+        cost += _selection_cost(
+            schema,
+            field_type,
+            selection.selection_set,
+            fragments,
+            variable_values,
+            count,
+            inner_page,
+        )
+    return cost
+
+
+def operation_cost(schema, operation, fragments, variable_values):
+    """
+    static cost of an operation, roughly the number of rows it will load
+    weighted by FIELD_WEIGHTS
+
+    lists & connections are assumed to hold first/last items where given and
+    LIST_SIZES otherwise, nested ones multiply
+    """
+    return _selection_cost(
+        schema,
+        schema.get_query_type(),
+        operation.selection_set,
+        fragments,
+        variable_values or {},
+        1,
+        None,
+    )
+
+
+class _CostCache:
+    """costs of the most recently seen (operation, variables)"""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.costs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, schema, operation, fragments, variable_values):
+        variables = json.dumps(variable_values, sort_keys=True, default=str)
+        key = (id(operation), variables)
+        with self.lock:
+            entry = self.costs.get(key)
+            # the operation is kept in the entry so its id can't be reused
+            if entry and entry[0] is operation:
+                self.costs.move_to_end(key)
+                return entry[1]
+
+        cost = operation_cost(schema, operation, fragments, variable_values)
+        with self.lock:
+            self.costs[key] = (operation, cost)
+            if len(self.costs) > self.max_size:
+                self.costs.popitem(last=False)
+        return cost
+
+
+cost_cache = _CostCache()
 
 
 class QueryProtectionMiddleware(object):
+    # enough for a page of 100 bills with all their details (~3700) or a page of
+    # 85 bills with every nested field (~4800), see test_client_query_costs
     def __init__(self, max_cost=5000):
         self.max_cost = max_cost
 
+    def budget(self, schema, operation, fragments, variable_values):
+        cost = cost_cache.get(schema, operation, fragments, variable_values)
+        return {
+            "requested": cost,
+            "limit": self.max_cost,
+            "remaining": max(self.max_cost - cost, 0),
+        }
+
     def resolve(self, next, root, info, **args):
         if root is None:
-            count = _get_counts(
-                info.field_asts[0], info.fragments, info.variable_values
-            )
+            # the whole operation shares one budget, so aliasing a root field
+            # many times doesn't get around it
+            budget = getattr(info.context, "graphql_cost", None)
+            if budget is None:
+                budget = self.budget(
+                    info.schema, info.operation, info.fragments, info.variable_values
+                )
+                if info.context is not None:
+                    # reported in the response's extensions by KeyedGraphQLView
+                    info.context.graphql_cost = budget
             log.debug(
-                f"graphql query name={info.field_name} asts={info.field_asts} cost={count}"
+                f"graphql query name={info.field_name} asts={info.field_asts} "
+                f"cost={budget['requested']}"
             )
-            if count > self.max_cost:
-                raise QueryCostException(
-                    f"Query Cost is too high ({count}), limit is {self.max_cost}"
-                )
+            self.check(budget)
         return next(root, info, **args)
+
+    def check(self, budget):
+        """raise QueryCostException if budget is over the limit"""
+        if budget["requested"] > self.max_cost:
+            raise QueryCostException(
+                f"Query Cost is too high ({budget['requested']}), "
+                f"limit is {self.max_cost}"
+            )
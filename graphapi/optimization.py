@@ -1,5 +1,34 @@
 import re
-from graphql.language.ast import FragmentSpread
+from functools import lru_cache
+from django.db.models import Prefetch
+from graphql.language.ast import FragmentSpread, InlineFragment
+
+# columns that are only loaded if the GraphQL field they back is selected,
+# None for columns that no field exposes
+#
+# everything else is always loaded, resolvers rely on ids, foreign keys and the
+# like regardless of what was selected
+DEFERRABLE_COLUMNS = {
+    "data.Bill": {
+        "extras": ".extras",
+        "title": ".title",
+        "subject": ".subject",
+        "citations": None,
+        "latest_action_description": None,
+    },
+    "data.Person": {
+        "extras": ".extras",
+        "biography": None,
+        "current_role": None,
+    },
+    "data.Organization": {
+        "extras": ".extras",
+        "links": ".links",
+        "sources": ".sources",
+        "other_names": ".otherNames",
+    },
+    "data.VoteEvent": {"extras": ".extras", "motion_text": ".motionText"},
+}
 
 
 def _to_snake(word):
@@ -7,6 +36,8 @@ def _to_snake(word):
     return re.sub("([a-z0-9])([A-Z])", r"\1_\2", s1).lower()
 
 
+# paths all come from the resolvers so the cache stays small
+@lru_cache(maxsize=None)
 def transform_path(path):
     pieces = path.split(".")
     if pieces[0] != "":
@@ -15,12 +46,38 @@ def transform_path(path):
     return "__".join(_to_snake(piece) for piece in pieces[1:])
 
 
-def get_field_names(info):
-    # info.operation has the entire operation, could be used for
-    # cross-query optimization potentially
-    return list(
-        _yield_field_names(info.field_asts[0].selection_set, "", info.fragments)
-    )
+def get_field_names(info, prefix=None):
+    """
+    set of field paths (e.g. .actions.organization) selected below info's field
+
+    with prefix only paths within prefix are included, relative to it
+
+    the same field is analysed many times per request (once per parent object
+    and by each optimize() call in a resolver) so results are cached on the
+    request for as long as it lives
+    """
+    cache = getattr(info.context, "graphql_field_names", None)
+    if cache is None:
+        cache = {}
+        if info.context is not None:
+            info.context.graphql_field_names = cache
+
+    # the AST nodes live as long as the request, so their ids are stable keys
+    key = (id(info.operation), id(info.field_asts[0]), prefix)
+    if key not in cache:
+        if prefix:
+            cache[key] = frozenset(
+                fn.replace(prefix, "")
+                for fn in get_field_names(info)
+                if fn.startswith(prefix)
+            )
+        else:
+            # info.operation has the entire operation, could be used for
+            # cross-query optimization potentially
+            cache[key] = frozenset(
+                _yield_field_names(info.field_asts[0].selection_set, "", info.fragments)
+            )
+    return cache[key]
 
 
 def _yield_field_names(selection_set, prefix, fragments):
@@ -32,6 +89,8 @@ def _yield_field_names(selection_set, prefix, fragments):
             yield from _yield_field_names(
                 fragments[selection.name.value].selection_set, prefix, fragments
             )
+        elif isinstance(selection, InlineFragment):
+            yield from _yield_field_names(selection.selection_set, prefix, fragments)
         else:
             # normal handling for Field selections
             if selection.name.value not in ("edges", "node"):
@@ -46,32 +105,88 @@ def _yield_field_names(selection_set, prefix, fragments):
                 )
 
 
+def _deferred_columns(model, field_names, path="", lookup=""):
+    """columns of model (reached via lookup) that no field below path needs"""
+    columns = DEFERRABLE_COLUMNS.get(model._meta.label, {})
+    return [
+        lookup + column
+        for column, field in columns.items()
+        if field is None or path + field not in field_names
+    ]
+
+
+def _related_model(model, lookup):
+    for name in lookup.split("__"):
+        model = model._meta.get_field(name).related_model
+    return model
+
+
+def _project(model, field, prefetch, field_names):
+    """prefetch with a queryset that skips unneeded columns, if there are any"""
+    if isinstance(prefetch, Prefetch):
+        queryset = prefetch.queryset
+        if queryset is None:
+            queryset = _related_model(model, prefetch.prefetch_through)._default_manager
+        deferred = _deferred_columns(queryset.model, field_names, field)
+        if not deferred:
+            return prefetch
+        return Prefetch(
+            prefetch.prefetch_through,
+            queryset=queryset.defer(*deferred),
+            to_attr=prefetch.to_attr,
+        )
+
+    related_model = _related_model(model, prefetch)
+    deferred = _deferred_columns(related_model, field_names, field)
+    if not deferred:
+        return prefetch
+    return Prefetch(prefetch, queryset=related_model._default_manager.defer(*deferred))
+
+
+def _prefetch_depth(prefetch):
+    if isinstance(prefetch, Prefetch):
+        prefetch = prefetch.prefetch_through
+    return prefetch.count("__")
+
+
 def optimize(queryset, info, prefetch, select_related=None, *, prefix=None):
-    to_prefetch = set()
+    to_prefetch = []
     to_select = set()
-    field_names = get_field_names(info)
-
     # only take fields that are within prefix (used for Prefetch() sub-field optimization)
-    if prefix:
-        field_names = [
-            fn.replace(prefix, "") for fn in field_names if fn.startswith(prefix)
-        ]
+    field_names = get_field_names(info, prefix)
+    model = queryset.model
 
     if prefetch:
         for field in prefetch:
             if isinstance(field, tuple):
                 field, prefetch_name = field
                 if field in field_names:
-                    to_prefetch.add(prefetch_name)
+                    to_prefetch.append(
+                        _project(model, field, prefetch_name, field_names)
+                    )
             elif isinstance(field, str):
                 if field in field_names:
-                    to_prefetch.add(transform_path(field))
+                    to_prefetch.append(
+                        _project(model, field, transform_path(field), field_names)
+                    )
+        # prefetches with a queryset have to come before any deeper lookup
+        # through them, or django will already have prefetched them without it
+        to_prefetch.sort(key=_prefetch_depth)
         queryset = queryset.prefetch_related(*to_prefetch)
 
+    deferred = _deferred_columns(model, field_names)
     if select_related:
         for field in select_related:
             if field in field_names:
-                to_select.add(transform_path(field))
+                lookup = transform_path(field)
+                to_select.add(lookup)
+                deferred += _deferred_columns(
+                    _related_model(model, lookup), field_names, field, lookup + "__"
+                )
         queryset = queryset.select_related(*to_select)
 
+    # large columns (e.g. extras) are left in the database unless selected
+    if deferred:
+        queryset = queryset.defer(*deferred)
+
     return queryset
@@ -0,0 +1,205 @@
+import json
+import hashlib
+import uuid
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from graphql.language.ast import Field, Variable
+from graphql.language.printer import print_ast
+from graphql.utils.get_operation_ast import get_operation_ast
+from openstates.data.models import (
+    Bill,
+    Jurisdiction,
+    LegislativeSession,
+    Membership,
+    Organization,
+    Person,
+    VoteEvent,
+)
+from utils.metadata import registry
+
+# tag of results that can't be narrowed down to jurisdictions, changes to any
+# jurisdiction invalidate them
+ALL_JURISDICTIONS = "*"
+
+
+@lru_cache(maxsize=256)
+def _document_hash(document):
+    # printing the AST drops whitespace, comments & such
+    return hashlib.sha256(print_ast(document.document_ast).encode("utf8")).hexdigest()
+
+
+def _argument(field, name, variables):
+    for argument in field.arguments:
+        if argument.name.value == name:
+            if isinstance(argument.value, Variable):
+                return variables.get(argument.value.name.value)
+            return getattr(argument.value, "value", None)
+    return None
+
+
+def _jurisdiction_id(jurisdiction):
+    """id of a jurisdiction given by id or name, None if unknown"""
+    if not isinstance(jurisdiction, str):
+        return None
+    try:
+        if jurisdiction.startswith("ocd-jurisdiction/"):
+            return registry.jurisdiction(id=jurisdiction).id
+        return registry.jurisdiction(name=jurisdiction).id
+    except Jurisdiction.DoesNotExist:
+        return None
+
+
+def _organization_jurisdiction_id(organization_id):
+    if not isinstance(organization_id, str):
+        return None
+    organization = registry.organization(organization_id)
+    return organization.jurisdiction_id if organization else None
+
+
+def _field_jurisdiction_id(field, variables):
+    """the one jurisdiction a root field's result comes from, if it is clear"""
+    name = field.name.value
+    if name == "jurisdiction":
+        return _jurisdiction_id(
+            _argument(field, "id", variables) or _argument(field, "name", variables)
+        )
+    if name in ("bill", "bills"):
+        return _jurisdiction_id(_argument(field, "jurisdiction", variables))
+    if name == "people":
+        return _organization_jurisdiction_id(
+            _argument(field, "memberOf", variables)
+            or _argument(field, "everMemberOf", variables)
+        )
+    if name == "organization":
+        return _organization_jurisdiction_id(_argument(field, "id", variables))
+    return None
+
+
+def jurisdiction_tags(operation, variables):
+    """jurisdictions whose changes would change the result of operation"""
+    tags = set()
+    for selection in operation.selection_set.selections:
+        if not isinstance(selection, Field):
+            return [ALL_JURISDICTIONS]
+        if selection.name.value.startswith("__"):
+            continue
+        jid = _field_jurisdiction_id(selection, variables)
+        if jid is None:
+            return [ALL_JURISDICTIONS]
+        tags.add(jid)
+    return sorted(tags)
+
+
+def _generation_key(tag):
+    return f"graphql-generation~{tag}"
+
+
+def generations(tags):
+    """
+    current generation of each tag
+
+    a counter bumped by changes saved here, along with the registry's record of
+    when bills & people were last imported so that imports done elsewhere are
+    picked up once it refreshes
+    """
+    cache = caches["default"]
+    keys = [_generation_key(tag) for tag in tags]
+    counters = cache.get_many(keys)
+    for key in keys:
+        if key not in counters:
+            # random rather than 0, an evicted counter can't revive old results
+            counters[key] = cache.get_or_set(key, uuid.uuid4().hex, None)
+
+    result = {}
+    for tag, key in zip(tags, keys):
+        latest = registry.latest_update(None if tag == ALL_JURISDICTIONS else tag)
+        result[tag] = f"{counters[key]}:{latest.isoformat() if latest else ''}"
+    return result
+
+
+def bump_generation(*jurisdiction_ids):
+    """invalidate cached results of jurisdiction_ids & those of every jurisdiction"""
+    tags = {jid for jid in jurisdiction_ids if jid} | {ALL_JURISDICTIONS}
+    caches["default"].set_many(
+        {_generation_key(tag): uuid.uuid4().hex for tag in tags}, None
+    )
+
+
+def result_cache_key(document, operation_name, variables):
+    """cache key of a query's result, None if it isn't a cacheable query"""
+    operation = get_operation_ast(document.document_ast, operation_name)
+    if operation is None or operation.operation != "query":
+        return None
+    variables = variables or {}
+    tags = generations(jurisdiction_tags(operation, variables))
+    key = json.dumps(
+        [_document_hash(document), operation_name, variables, tags],
+        sort_keys=True,
+        default=str,
+    )
+    return "graphql-result~" + hashlib.sha256(key.encode("utf8")).hexdigest()
+
+
+def get_result(key):
+    return caches["default"].get(key)
+
+
+def set_result(key, data, cost):
+    caches["default"].set(
+        key, {"data": data, "cost": cost}, settings.GRAPHQL_RESULT_CACHE_TIMEOUT
+    )
+
+
+def _session_jurisdiction_id(session_id):
+    return (
+        LegislativeSession.objects.filter(id=session_id)
+        .values_list("jurisdiction_id", flat=True)
+        .first()
+    )
+
+
+def _membership_jurisdiction_ids(membership):
+    # any organization, the registry only knows chambers. parties belong to no
+    # jurisdiction, but show up in the results of their members' jurisdiction
+    organization_jid = (
+        Organization.objects.filter(id=membership.organization_id)
+        .values_list("jurisdiction_id", flat=True)
+        .first()
+    )
+    person_jid = (
+        Person.objects.filter(id=membership.person_id)
+        .values_list("current_jurisdiction_id", flat=True)
+        .first()
+    )
+    return [organization_jid, person_jid]
+
+
+def _changed_jurisdiction_ids(instance):
+    if isinstance(instance, (Bill, VoteEvent)):
+        return [_session_jurisdiction_id(instance.legislative_session_id)]
+    if isinstance(instance, Person):
+        return [instance.current_jurisdiction_id]
+    if isinstance(instance, Membership):
+        return _membership_jurisdiction_ids(instance)
+    if isinstance(instance, Jurisdiction):
+        return [instance.id]
+    return [instance.jurisdiction_id]
+
+
+def _invalidate(sender, instance, **kwargs):
+    bump_generation(*_changed_jurisdiction_ids(instance))
+
+
+for _model in (
+    Bill,
+    VoteEvent,
+    Person,
+    Membership,
+    Organization,
+    LegislativeSession,
+    Jurisdiction,
+):
+    post_save.connect(_invalidate, sender=_model, dispatch_uid="graphql-result-cache")
+    post_delete.connect(_invalidate, sender=_model, dispatch_uid="graphql-result-cache")
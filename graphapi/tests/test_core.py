@@ -104,7 +104,8 @@ def test_jurisdictions_num_queries_subquery(django_assert_num_queries):
 
 @pytest.mark.django_db
 def test_jurisdiction_by_id(django_assert_num_queries):
-    with django_assert_num_queries(5):
+    # the jurisdiction itself comes from the metadata registry
+    with django_assert_num_queries(2):
         result = schema.execute(
             """ {
             jurisdiction(id:"ocd-jurisdiction/country:us/state:wy/government") {
@@ -126,7 +127,7 @@ def test_jurisdiction_by_id(django_assert_num_queries):
 
 @pytest.mark.django_db
 def test_jurisdiction_by_name(django_assert_num_queries):
-    with django_assert_num_queries(5):
+    with django_assert_num_queries(2):
         result = schema.execute(
             """ {
             jurisdiction(name:"Wyoming") {
@@ -148,7 +149,7 @@ def test_jurisdiction_by_name(django_assert_num_queries):
 
 @pytest.mark.django_db
 def test_jurisdiction_chambers_current_members(django_assert_num_queries):
-    with django_assert_num_queries(5):
+    with django_assert_num_queries(3):
         result = schema.execute(
             """ {
             jurisdiction(name:"Wyoming") {
@@ -182,7 +183,7 @@ def test_people_by_member_of(django_assert_num_queries):
     ak_house = Organization.objects.get(
         jurisdiction__name="Alaska", classification="lower"
     )
-    with django_assert_num_queries(2):
+    with django_assert_num_queries(1):
         result = schema.execute(
             """ {
             people(memberOf: "%s", first: 50) {
@@ -205,7 +206,7 @@ def test_variable_people_by_member_of(django_assert_num_queries):
     ak_house = Organization.objects.get(
         jurisdiction__name="Alaska", classification="lower"
     )
-    with django_assert_num_queries(2):
+    with django_assert_num_queries(1):
         result = schema.execute(
             """
             query peeps($f: Int){
@@ -230,7 +231,7 @@ def test_people_by_ever_member_of(django_assert_num_queries):
     ak_house = Organization.objects.get(
         jurisdiction__name="Alaska", classification="lower"
     )
-    with django_assert_num_queries(2):
+    with django_assert_num_queries(1):
         result = schema.execute(
             """ {
             people(everMemberOf: "%s", first:50) {
@@ -329,7 +330,7 @@ def test_people_by_party():
 
 @pytest.mark.django_db
 def test_people_num_queries(django_assert_num_queries):
-    with django_assert_num_queries(8):
+    with django_assert_num_queries(7):
         result = schema.execute(
             """ {
         people(first: 50) {
@@ -404,7 +405,7 @@ def test_people_total_count(django_assert_num_queries):
 
 @pytest.mark.django_db
 def test_people_current_memberships_classification(django_assert_num_queries):
-    with django_assert_num_queries(3):
+    with django_assert_num_queries(2):
         result = schema.execute(
             """ {
         people(first: 50) {
@@ -427,7 +428,7 @@ def test_people_current_memberships_classification(django_assert_num_queries):
 
 @pytest.mark.django_db
 def test_people_old_memberships(django_assert_num_queries):
-    with django_assert_num_queries(3):
+    with django_assert_num_queries(2):
         result = schema.execute(
             """{
         people(first: 50) {
@@ -555,9 +556,9 @@ def test_organization_by_id(django_assert_num_queries):
     )
     sen = Organization.objects.get(jurisdiction__name="Wyoming", classification="upper")
 
-    # 1 query for legislature, 1 query each for children
-    # 1 query for senate w/ parent
-    with django_assert_num_queries(4):
+    # legislature & senate w/ parent come from the metadata registry
+    # 1 query for children
+    with django_assert_num_queries(1):
         result = schema.execute(
             """ {
             leg: organization(id: "%s") {
@@ -642,3 +643,26 @@ def test_jurisdiction_fragment(django_assert_num_queries):
     }"""
         )
     assert result.errors is None
+
+
+@pytest.mark.django_db
+def test_people_keyset_pagination():
+    names = []
+    after = ""
+    while True:
+        result = schema.execute(
+            """{
+            people(first: 2, after: "%s") {
+                edges { node { name } }
+                pageInfo { endCursor hasNextPage }
+            }
+        }"""
+            % after
+        )
+        assert result.errors is None
+        names += [e["node"]["name"] for e in result.data["people"]["edges"]]
+        if not result.data["people"]["pageInfo"]["hasNextPage"]:
+            break
+        after = result.data["people"]["pageInfo"]["endCursor"]
+
+    assert names == sorted(Person.objects.values_list("name", flat=True))
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import threading
+import pytest
+from concurrent.futures import Future
+from asgiref.sync import async_to_sync
+from graphql import parse
+from django.test import RequestFactory
+from graphapi import execution
+from graphapi.schema import schema
+from graphapi.documents import CachedDocumentBackend
+from graphapi.middleware import QueryProtectionMiddleware
+from graphapi.views import AsyncKeyedGraphQLView, KeyedGraphQLView
+from .utils import populate_db
+
+
+@pytest.mark.django_db
+def setup():
+    populate_db()
+
+
+class Context:
+    pass
+
+
+class InlinePool:
+    # worker threads have their own connections, which can't see the test's data
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+@pytest.mark.django_db
+def test_split_operation():
+    document = parse(
+        """query q($n: Int) {
+            a: jurisdiction(name: "Alaska") { ...j }
+            bills(first: $n) { edges { node { id } } }
+            a: jurisdiction(name: "Alaska") { id }
+        }
+        fragment j on JurisdictionNode { name }"""
+    )
+    operation = document.definitions[0]
+    documents = execution.split_operation(document, operation)
+    assert len(documents) == 2
+    # fields with the same response key stay together
+    assert len(documents[0].definitions[0].selection_set.selections) == 2
+    assert documents[1].definitions[0].variable_definitions
+    for split in documents:
+        assert split.definitions[1].name.value == "j"
+
+    assert (
+        execution.split_operation(
+            document, parse("{ bills { edges { node { id } } } }").definitions[0]
+        )
+        is None
+    )
+
+
+@pytest.mark.django_db
+def test_execute_concurrently():
+    # jurisdictions come from the metadata registry, so real threads are fine
+    query = """{
+        wy: jurisdiction(name: "Wyoming") { name }
+        ak: jurisdiction(name: "Alaska") { name }
+        nowhere: jurisdiction(name: "Nowhere") { name }
+    }"""
+    backend = CachedDocumentBackend(execute=execution.execute_concurrently)
+    context = Context()
+    result = backend.document_from_string(schema, query).execute(
+        context_value=context, middleware=[QueryProtectionMiddleware(5000)]
+    )
+    assert list(result.data) == ["wy", "ak", "nowhere"]
+    assert result.data["wy"]["name"] == "Wyoming"
+    assert result.data["ak"]["name"] == "Alaska"
+    assert result.data["nowhere"] is None
+    assert len(result.errors) == 1
+    # costed as a whole
+    assert context.graphql_cost["requested"] == 3
+
+
+@pytest.mark.django_db
+def test_execute_concurrently_cost(monkeypatch):
+    monkeypatch.setattr(execution, "root_field_pool", InlinePool())
+    query = "{ %s }" % " ".join(
+        f"b{n}: bills(first: 100) {{ edges {{ node {{ id }} }} }}" for n in range(50)
+    )
+    backend = CachedDocumentBackend(execute=execution.execute_concurrently)
+    result = backend.document_from_string(schema, query).execute(
+        context_value=Context(), middleware=[QueryProtectionMiddleware(5000)]
+    )
+    # rejected once, not by each root field
+    assert len(result.errors) == 1
+    assert "(5050)" in str(result.errors[0])
+    assert result.data == {f"b{n}": None for n in range(50)}
+
+
+# requests are handled in worker threads, which only see committed data
+@pytest.mark.django_db(transaction=True)
+def test_async_view():
+    view = AsyncKeyedGraphQLView.as_view(middleware=[QueryProtectionMiddleware(5000)])
+    query = """{
+        jurisdiction(name: "Alaska") { name }
+        bills(first: 2) { edges { node { identifier } } }
+    }"""
+    request = RequestFactory().post(
+        "/graphql",
+        json.dumps({"query": query}),
+        content_type="application/json",
+        HTTP_ORIGIN="http://testserver",
+    )
+    response = async_to_sync(view)(request)
+    assert response.status_code == 200
+    result = json.loads(response.content)
+    assert result["data"]["jurisdiction"]["name"] == "Alaska"
+    assert len(result["data"]["bills"]["edges"]) == 2
+    assert result["extensions"]["cost"]["requested"] == 4
+
+
+@pytest.mark.django_db
+def test_async_view_requires_key():
+    view = AsyncKeyedGraphQLView.as_view()
+    request = RequestFactory().post(
+        "/graphql",
+        json.dumps({"query": '{ jurisdiction(name: "Alaska") { name } }'}),
+        content_type="application/json",
+    )
+    response = async_to_sync(view)(request)
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_async_view_concurrent(monkeypatch):
+    # each request waits for the others, so they have to be handled at once
+    barrier = threading.Barrier(4, timeout=5)
+
+    def get_response(self, request, data, show_graphiql=False):
+        barrier.wait()
+        return "{}", 200
+
+    monkeypatch.setattr(KeyedGraphQLView, "get_response", get_response)
+    view = AsyncKeyedGraphQLView.as_view()
+    request = RequestFactory().post("/graphql", "{}", content_type="application/json")
+
+    async def requests():
+        return await asyncio.gather(*(view(request) for _ in range(4)))
+
+    responses = async_to_sync(requests)()
+    assert [response.status_code for response in responses] == [200] * 4
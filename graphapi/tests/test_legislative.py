@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from graphapi.schema import schema
 from openstates.data.models import Bill, Person
 from .utils import populate_db
@@ -161,6 +163,37 @@ def test_bill_by_openstates_url(django_assert_num_queries):
         assert result.data["bill"]["id"] == "ocd-bill/1"
 
 
+@pytest.mark.django_db
+def test_bills_by_ids(django_assert_num_queries):
+    # bills, then one per prefetched relation
+    with django_assert_num_queries(2):
+        result = schema.execute(
+            """ {
+            billsByIds(
+                ids: ["ocd-bill/1", "ocd-bill/nonsense"],
+                openstatesUrls: ["https://openstates.org/ak/bills/2018/HB1"]
+            ) {
+                id identifier abstracts { abstract }
+            }
+        }"""
+        )
+    assert result.errors is None
+    bills = result.data["billsByIds"]
+    # in the order they were asked for, missing bills are null
+    assert [b and b["id"] for b in bills] == ["ocd-bill/1", None, "ocd-bill/1"]
+    assert len(bills[0]["abstracts"]) == 2
+
+
+@pytest.mark.django_db
+def test_bills_by_ids_limit():
+    ids = ", ".join(f'"ocd-bill/{n}"' for n in range(101))
+    result = schema.execute("{ billsByIds(ids: [%s]) { id } }" % ids)
+    assert "can only look up 100 bills at a time" in str(result.errors[0])
+
+    result = schema.execute("{ billsByIds { id } }")
+    assert "must pass 'ids' or 'openstatesUrls'" in str(result.errors[0])
+
+
 @pytest.mark.django_db
 def test_bill_by_jurisdiction_name_session_identifier(django_assert_num_queries):
     with django_assert_num_queries(1):
@@ -203,8 +236,8 @@ def test_bill_by_jurisdiction_session_identifier_404():
 
 @pytest.mark.django_db
 def test_bills_by_jurisdiction(django_assert_num_queries):
-    # 2 bills queries + 2 count queries
-    with django_assert_num_queries(4):
+    # 2 bills queries, no counts since totalCount is not selected
+    with django_assert_num_queries(2):
         result = schema.execute(
             """ {
             ak: bills(jurisdiction:"Alaska", first: 50) {
@@ -222,7 +255,7 @@ def test_bills_by_jurisdiction(django_assert_num_queries):
 
 @pytest.mark.django_db
 def test_bills_by_chamber(django_assert_num_queries):
-    with django_assert_num_queries(4):
+    with django_assert_num_queries(2):
         result = schema.execute(
             """ {
             lower: bills(chamber:"lower", first:50) {
@@ -240,7 +273,7 @@ def test_bills_by_chamber(django_assert_num_queries):
 
 @pytest.mark.django_db
 def test_bills_by_session(django_assert_num_queries):
-    with django_assert_num_queries(4):
+    with django_assert_num_queries(2):
         result = schema.execute(
             """ {
             y2018: bills(session:"2018", first:50) {
@@ -258,7 +291,7 @@ def test_bills_by_session(django_assert_num_queries):
 
 @pytest.mark.django_db
 def test_bills_by_classification(django_assert_num_queries):
-    with django_assert_num_queries(4):
+    with django_assert_num_queries(2):
         result = schema.execute(
             """ {
             bills: bills(classification: "bill", first:50) {
@@ -339,7 +372,7 @@ def test_bills_by_updated_since():
 
 @pytest.mark.django_db
 def test_bills_queries(django_assert_num_queries):
-    with django_assert_num_queries(21):
+    with django_assert_num_queries(20):
         result = schema.execute(
             """ {
             bills(first: 50) { edges { node {
@@ -470,6 +503,56 @@ def test_bills_pagination_forward():
     assert len(bills) == 26
 
 
+@pytest.mark.django_db
+def test_bills_pagination_count_only_when_selected(django_assert_num_queries):
+    query = """{
+        bills(jurisdiction: "Alaska", first: 6, after: "%s") {
+            %s
+            edges { node { identifier } }
+            pageInfo { endCursor hasNextPage }
+        }
+    }"""
+    # 6 of Alaska's 12 bills are fetched along with one more to see if there's a
+    # next page, without a count
+    with django_assert_num_queries(1):
+        result = schema.execute(query % ("", ""))
+    assert len(result.data["bills"]["edges"]) == 6
+    assert result.data["bills"]["pageInfo"]["hasNextPage"] is True
+
+    with django_assert_num_queries(1):
+        result = schema.execute(
+            query % (result.data["bills"]["pageInfo"]["endCursor"], "")
+        )
+    assert len(result.data["bills"]["edges"]) == 6
+    assert result.data["bills"]["pageInfo"]["hasNextPage"] is False
+
+    with django_assert_num_queries(2):
+        result = schema.execute(query % ("", "totalCount"))
+    assert result.data["bills"]["totalCount"] == 12
+    assert result.data["bills"]["pageInfo"]["hasNextPage"] is True
+
+
+@pytest.mark.django_db
+def test_connections_inline_fragments():
+    result = schema.execute(
+        """{
+        jurisdiction(name: "Alaska") {
+            legislativeSessions { edges { node {
+                ... on LegislativeSessionNode { identifier }
+            } } }
+        }
+        bills(jurisdiction: "Alaska", first: 6) {
+            ... on BillConnection { totalCount }
+            edges { node { ... on BillNode { identifier } } }
+        }
+    }"""
+    )
+    assert result.errors is None
+    assert result.data["jurisdiction"]["legislativeSessions"]["edges"]
+    # the count is selected within the fragment
+    assert result.data["bills"]["totalCount"] == 12
+
+
 @pytest.mark.django_db
 def test_bills_pagination_backward():
     bills = []
@@ -502,6 +585,59 @@ def test_bills_pagination_backward():
     assert len(bills) == 26
 
 
+def _walk_bills(after=""):
+    identifiers = []
+    while True:
+        result = schema.execute(
+            """{
+            bills(first: 5, after: "%s") {
+                edges { node { id } }
+                pageInfo { endCursor hasNextPage }
+            }
+        }"""
+            % after
+        )
+        assert result.errors is None
+        identifiers += [e["node"]["id"] for e in result.data["bills"]["edges"]]
+        if not result.data["bills"]["pageInfo"]["hasNextPage"]:
+            return identifiers
+        after = result.data["bills"]["pageInfo"]["endCursor"]
+
+
+@pytest.mark.django_db
+def test_bills_keyset_pagination_ties():
+    # every bill updated at the same moment, id breaks the tie
+    Bill.objects.update(updated_at="2021-01-01T00:00:00Z")
+    ids = _walk_bills()
+    assert len(ids) == 26
+    assert ids == sorted(ids, reverse=True)
+
+
+@pytest.mark.django_db
+def test_bills_keyset_pagination_no_offset(django_assert_num_queries):
+    first_page = schema.execute(
+        """{ bills(first: 20) { pageInfo { endCursor } } }"""
+    ).data["bills"]["pageInfo"]["endCursor"]
+
+    with django_assert_num_queries(1) as captured:
+        result = schema.execute(
+            """{ bills(first: 20, after: "%s") { edges { node { id } } } }"""
+            % first_page
+        )
+    assert len(result.data["bills"]["edges"]) == 6
+    sql = captured.captured_queries[0]["sql"]
+    assert "OFFSET" not in sql
+    assert '"updated_at" <' in sql
+
+
+@pytest.mark.django_db
+def test_bills_offset_cursor_still_works():
+    # arrayconnection:19, as handed out before keyset cursors
+    ids = _walk_bills("YXJyYXljb25uZWN0aW9uOjE5")
+    assert len(ids) == 6
+    assert ids == _walk_bills()[20:]
+
+
 @pytest.mark.django_db
 def test_bills_max_items():
     result = schema.execute(
@@ -651,7 +787,7 @@ def test_bill_fts():
 
 @pytest.mark.django_db
 def test_bills_order(django_assert_num_queries):
-    with django_assert_num_queries(2):
+    with django_assert_num_queries(1):
         result = schema.execute(
             """ {
             ak: bills(jurisdiction:"Alaska", first: 50) {
@@ -757,3 +893,33 @@ def test_real_example_bill_query(django_assert_num_queries):
         result = schema.execute(query)
     assert result.errors is None
     assert result.data["bill"] is not None
+
+
+@pytest.mark.django_db
+def test_bills_column_projection():
+    with CaptureQueriesContext(connection) as queries:
+        result = schema.execute(
+            """{ bills(first: 5) { edges { node {
+                id identifier
+                fromOrganization { name }
+                votes { edges { node { result } } }
+            } } } }"""
+        )
+    assert result.errors is None
+    bills_sql, organizations_sql, votes_sql = [q["sql"] for q in queries]
+    assert '"opencivicdata_bill"."identifier"' in bills_sql
+    # unselected large columns are left out, of bills & prefetched objects
+    assert '"opencivicdata_bill"."extras"' not in bills_sql
+    assert '"opencivicdata_bill"."title"' not in bills_sql
+    assert '"opencivicdata_organization"."name"' in organizations_sql
+    assert '"opencivicdata_organization"."links"' not in organizations_sql
+    assert '"opencivicdata_voteevent"."result"' in votes_sql
+    assert '"opencivicdata_voteevent"."motion_text"' not in votes_sql
+
+    with CaptureQueriesContext(connection) as queries:
+        result = schema.execute(
+            "{ bills(first: 5) { edges { node { title extras } } } }"
+        )
+    assert result.errors is None
+    assert '"opencivicdata_bill"."extras"' in queries[0]["sql"]
+    assert '"opencivicdata_bill"."title"' in queries[0]["sql"]
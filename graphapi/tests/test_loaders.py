@@ -0,0 +1,102 @@
+import datetime
+import pytest
+from django.core.cache import caches
+from django.test import RequestFactory
+from openstates.data.models import Bill, Jurisdiction, Organization, Person, RunPlan
+from graphapi.schema import schema
+from .utils import populate_db
+
+
+@pytest.mark.django_db
+def setup():
+    populate_db()
+
+
+HOUSE_MEMBERS_QUERY = """{
+    organization(id: "%s") {
+        currentMemberships {
+            person {
+                name
+                identifiers { identifier }
+                links { url }
+            }
+        }
+    }
+}"""
+
+
+@pytest.mark.django_db
+def test_sibling_relations_batched(django_assert_num_queries):
+    house = Organization.objects.get(
+        jurisdiction__name="Alaska", classification="lower"
+    )
+    for person in Person.objects.filter(memberships__organization=house):
+        person.identifiers.create(scheme="test", identifier=person.name)
+
+    # without a request every person's identifiers & links are their own query
+    # memberships, 4 people x (identifiers + links), the org is in the registry
+    with django_assert_num_queries(9):
+        result = schema.execute(HOUSE_MEMBERS_QUERY % house.id)
+    assert result.errors is None
+
+    # memberships, identifiers, links
+    with django_assert_num_queries(3):
+        batched = schema.execute(
+            HOUSE_MEMBERS_QUERY % house.id,
+            context_value=RequestFactory().post("/graphql"),
+        )
+    assert batched.errors is None
+    assert batched.data == result.data
+    memberships = batched.data["organization"]["currentMemberships"]
+    assert len(memberships) == 4
+    for m in memberships:
+        assert m["person"]["identifiers"] == [{"identifier": m["person"]["name"]}]
+
+
+@pytest.mark.django_db
+def test_loader_is_request_scoped():
+    request = RequestFactory().post("/graphql")
+    query = '{ bill(id: "ocd-bill/1") { abstracts { abstract } } }'
+    result = schema.execute(query, context_value=request)
+    assert result.errors is None
+    assert len(request.graphql_loaders) == 1
+
+    # a new request doesn't see what the last one loaded
+    Bill.objects.get(id="ocd-bill/1").abstracts.create(abstract="new", note="")
+    again = schema.execute(query, context_value=RequestFactory().post("/graphql"))
+    assert (
+        len(again.data["bill"]["abstracts"])
+        == len(result.data["bill"]["abstracts"]) + 1
+    )
+
+
+@pytest.mark.django_db
+def test_last_scraped_at_batched(django_assert_num_queries):
+    caches["default"].clear()
+    alaska = Jurisdiction.objects.get(name="Alaska")
+    end = datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)
+    for days, success in ((0, True), (1, True), (2, False)):
+        RunPlan.objects.create(
+            jurisdiction=alaska,
+            success=success,
+            start_time=end,
+            end_time=end + datetime.timedelta(days=days),
+        )
+
+    query = "{ jurisdictions { edges { node { name lastScrapedAt } } } }"
+    # count & jurisdictions, then runs of all of them at once
+    with django_assert_num_queries(3):
+        result = schema.execute(query, context_value=RequestFactory().post("/graphql"))
+    assert result.errors is None
+    scraped = {
+        edge["node"]["name"]: edge["node"]["lastScrapedAt"]
+        for edge in result.data["jurisdictions"]["edges"]
+    }
+    # the latest successful run
+    assert scraped == {"Alaska": "2021-01-02 00:00:00+00:00", "Wyoming": None}
+
+    # then cached for a while, even for jurisdictions that were never scraped
+    with django_assert_num_queries(2):
+        again = schema.execute(query, context_value=RequestFactory().post("/graphql"))
+    assert again.data == result.data
+    caches["default"].clear()
@@ -1,7 +1,8 @@
 import pytest
 from graphapi.schema import schema
+from graphapi.documents import CachedDocumentBackend
 from .utils import populate_db
-from ..middleware import QueryProtectionMiddleware
+from ..middleware import QueryProtectionMiddleware, cost_cache
 
 
 @pytest.mark.django_db
@@ -9,6 +10,21 @@ def setup():
     populate_db()
 
 
+class Context:
+    pass
+
+
+def _cost(query, variables=None):
+    context = Context()
+    schema.execute(
+        query,
+        context_value=context,
+        variable_values=variables,
+        middleware=[QueryProtectionMiddleware(5000)],
+    )
+    return context.graphql_cost["requested"]
+
+
 @pytest.mark.django_db
 def test_simple_costs(django_assert_num_queries):
     result = schema.execute(
@@ -29,12 +45,45 @@ def test_simple_costs(django_assert_num_queries):
         middleware=[QueryProtectionMiddleware(0)],
     )  # max cost to 0 so everything errors
     assert len(result.errors) == 3
+    # the whole operation is costed: 1 bill, 100 bills + connection,
+    # 52 jurisdictions + connection each with 2x (3 organizations + connection)
+    for error in result.errors:
+        assert "(571)" in str(error)
+
+
+@pytest.mark.django_db
+def test_individual_costs():
     # one item
-    assert "(1)" in str(result.errors[0])
-    # 100 bills
-    assert "(100)" in str(result.errors[1])
-    # each jurisdiction has 6 items beneath it
-    assert "(6)" in str(result.errors[2])
+    assert _cost('{ bill(id: "x") { title } }') == 1
+    # 100 bills & the connection
+    assert _cost("{ bills(first:100) { edges { node { title } } } }") == 101
+    assert (
+        _cost(
+            "query q($n: Int) { bills(first:$n) { edges { node { title } } } }",
+            {"n": 20},
+        )
+        == 21
+    )
+    # totalCount & weighted fields count, edges & pageInfo don't
+    assert (
+        _cost(
+            "{ bills(first:10) { totalCount pageInfo { hasNextPage } "
+            "edges { node { title } } } }"
+        )
+        == 12
+    )
+
+
+@pytest.mark.django_db
+def test_default_page_sizes():
+    # lists & connections without first/last are assumed to be full
+    assert _cost("{ jurisdictions { edges { node { name } } } }") == 53
+    # billsByIds is charged for as many bills as it can return
+    assert _cost('{ billsByIds(ids: ["x"]) { id } }') == 100
+    assert (
+        _cost('{ bill(id: "x") { votes { edges { node { votes { voterName } } } } } }')
+        == 1 + 1 + 5 + 5 * 100
+    )
 
 
 @pytest.mark.django_db
@@ -51,4 +100,152 @@ def test_fragment_cost(django_assert_num_queries):
         middleware=[QueryProtectionMiddleware(0)],
     )
     assert len(result.errors) == 1
-    assert "(6)" in str(result.errors[0])
+    assert "(469)" in str(result.errors[0])
+
+
+@pytest.mark.django_db
+def test_inline_fragment_cost():
+    context = Context()
+    result = schema.execute(
+        """{ jurisdictions { edges { node {
+            ... on JurisdictionNode { organizations(first: 3) { edges { node { name } } } }
+            ... { organizations(first: 3) { edges { node { name } } } }
+        } } } }""",
+        context_value=context,
+        middleware=[QueryProtectionMiddleware(5000)],
+    )
+    assert result.errors is None
+    assert context.graphql_cost["requested"] == 53 + 52 * 8
+
+
+@pytest.mark.django_db
+def test_alias_cost():
+    query = "{ %s }" % " ".join(
+        f"b{n}: bills(first:100) {{ edges {{ node {{ title }} }} }}" for n in range(50)
+    )
+    assert _cost(query) == 50 * 101
+
+    # aliases can't be used to get around the limit
+    result = schema.execute(query, middleware=[QueryProtectionMiddleware(5000)])
+    assert len(result.errors) == 50
+    assert "(5050)" in str(result.errors[0])
+
+
+@pytest.mark.django_db
+def test_cost_cached():
+    # costs are cached per parsed document, which the view's backend reuses
+    document = CachedDocumentBackend().document_from_string(
+        schema, "query q($n: Int) { bills(first:$n) { edges { node { title } } } }"
+    )
+
+    def cost(variables):
+        context = Context()
+        document.execute(
+            context_value=context,
+            variable_values=variables,
+            middleware=[QueryProtectionMiddleware(5000)],
+        )
+        return context.graphql_cost["requested"]
+
+    before = len(cost_cache.costs)
+    assert cost({"n": 5}) == 6
+    assert cost({"n": 5}) == 6
+    assert len(cost_cache.costs) == before + 1
+    # different variables are a different cost
+    assert cost({"n": 6}) == 7
+    assert len(cost_cache.costs) == before + 2
+
+
+@pytest.mark.django_db
+def test_remaining_budget():
+    context = Context()
+    schema.execute(
+        "{ bills(first:10) { edges { node { title } } } }",
+        context_value=context,
+        middleware=[QueryProtectionMiddleware(100)],
+    )
+    assert context.graphql_cost == {"requested": 11, "limit": 100, "remaining": 89}
+
+
+# the real queries in test_legislative, which clients page through bills with
+BILL_QUERY = """
+    id identifier title classification updatedAt createdAt
+    abstracts { abstract note date }
+    fromOrganization { id name classification }
+    legislativeSession { identifier jurisdiction { name } }
+    actions {
+        date description classification
+        relatedEntities { entityType name }
+        organization { id name }
+    }
+    sponsorships {
+        name entityType primary classification
+        organization { id name }
+        person { id name }
+    }
+    documents { date note links { url } }
+    versions { date note links { url mediaType text } }
+    sources { url note }
+"""
+BIG_QUERY = """
+    id identifier title classification subject createdAt updatedAt openstatesUrl
+    legislativeSession { identifier name classification jurisdiction { url } }
+    fromOrganization { name classification }
+    bill_summary: abstracts { abstract note date }
+    otherTitles { title note }
+    otherIdentifiers { identifier scheme note }
+    actions {
+        description date classification order
+        organization { id name extras links { note url } sources { note url } }
+        vote { id }
+        relatedEntities { name entityType }
+    }
+    relatedBills { identifier legislativeSession relationType }
+    versions { note date links { mediaType url text } }
+    sources { url note }
+    documents { note date links { mediaType url text } }
+"""
+
+
+@pytest.mark.django_db
+def test_client_query_costs():
+    # typical client queries, which the default limit has to allow
+    limit = QueryProtectionMiddleware().max_cost
+    assert limit == 5000
+    assert (
+        _cost(
+            """{ bills(first:100) { edges { node {
+                actions { description date }
+                sponsorships { name }
+            } } } }"""
+        )
+        == 1 + 100 * (1 + 10 + 5)
+    )
+    assert (
+        _cost(
+            """{ bills(first:50) { edges { node {
+                identifier
+                votes { edges { node { motionText counts { option value } } } }
+            } } } }"""
+        )
+        == 1 + 50 * (1 + 1 + 5 * (1 + 3))
+    )
+
+    # abstracts, actions & their entities, sponsorships, documents & versions
+    # with their links, sources
+    bill_cost = 1 + 10 * 2 + 5 + 2 * 2 + 2 * 2 + 2
+    assert _cost('{ bill(id: "x") { %s } }' % BILL_QUERY) == 1 + bill_cost
+    cost = _cost("{ bills(first:100) { edges { node { %s } } } }" % BILL_QUERY)
+    assert cost == 1 + 100 * (1 + bill_cost)
+    assert cost < limit
+
+    # also titles, identifiers, related bills & each action's organization's
+    # links & sources
+    bill_cost = 1 + 1 + 1 + 10 * 4 + 2 + 2 * 2 + 2 + 2 * 2
+    cost = _cost(
+        """{ bills(first:85) { totalCount pageInfo { endCursor hasNextPage }
+            edges { node { %s } } } }"""
+        % BIG_QUERY
+    )
+    assert cost == 2 + 85 * (1 + bill_cost)
+    assert cost < limit
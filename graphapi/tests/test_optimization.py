@@ -1,4 +1,7 @@
-from ..optimization import transform_path
+from types import SimpleNamespace
+from graphql import parse
+from graphql.language.ast import FragmentDefinition
+from ..optimization import get_field_names, transform_path
 
 
 def test_transform_path():
@@ -11,3 +14,74 @@ def test_transform_path():
 
     for input, output in examples:
         assert transform_path(input) == output
+
+
+def _make_info(query, context):
+    document = parse(query)
+    operation = document.definitions[0]
+    fragments = {
+        d.name.value: d
+        for d in document.definitions
+        if isinstance(d, FragmentDefinition)
+    }
+    return SimpleNamespace(
+        operation=operation,
+        field_asts=operation.selection_set.selections,
+        fragments=fragments,
+        context=context,
+    )
+
+
+QUERY = """{
+    bills(first: 10) {
+        edges { node { title actions { ...actionFields } } }
+    }
+}
+fragment actionFields on BillActionNode { description organization { name } }
+"""
+
+
+def test_get_field_names():
+    info = _make_info(QUERY, None)
+    assert get_field_names(info) == {
+        ".title",
+        ".actions",
+        ".actions.description",
+        ".actions.organization",
+        ".actions.organization.name",
+    }
+    assert get_field_names(info, ".actions") == {
+        "",
+        ".description",
+        ".organization",
+        ".organization.name",
+    }
+
+
+def test_get_field_names_inline_fragment():
+    info = _make_info(
+        """{ bills(first: 10) {
+            ... on BillConnection { totalCount }
+            edges { node { ... on BillNode { title actions { description } } } }
+        } }""",
+        None,
+    )
+    assert get_field_names(info) == {
+        ".totalCount",
+        ".title",
+        ".actions",
+        ".actions.description",
+    }
+
+
+def test_get_field_names_cached_on_request():
+    request = SimpleNamespace()
+    info = _make_info(QUERY, request)
+    first = get_field_names(info)
+    assert get_field_names(info) is first
+    actions = get_field_names(info, ".actions")
+    assert get_field_names(info, ".actions") is actions
+    assert len(request.graphql_field_names) == 2
+
+    # a new request analyses the query again
+    assert get_field_names(_make_info(QUERY, SimpleNamespace())) is not first
@@ -0,0 +1,132 @@
+import json
+import pytest
+from django.test import override_settings
+from graphql import parse
+from openstates.data.models import Bill, Membership, Organization
+from graphapi.result_cache import ALL_JURISDICTIONS, jurisdiction_tags
+from .utils import populate_db
+
+AK = "ocd-jurisdiction/country:us/state:ak/government"
+WY = "ocd-jurisdiction/country:us/state:wy/government"
+
+
+@pytest.mark.django_db
+def setup():
+    populate_db()
+
+
+def _tags(query, variables=None):
+    return jurisdiction_tags(parse(query).definitions[0], variables or {})
+
+
+@pytest.mark.django_db
+def test_jurisdiction_tags():
+    assert _tags('{ bills(jurisdiction: "Alaska") { totalCount } }') == [AK]
+    assert _tags(
+        "query q($j: String) { bills(jurisdiction: $j) { totalCount } }", {"j": WY}
+    ) == [WY]
+    assert (
+        _tags(
+            f"""{{ jurisdiction(id: "{WY}") {{ name }}
+        bill(jurisdiction: "Alaska", session: "2018", identifier: "HB 1") {{ id }}
+        __typename }}"""
+        )
+        == [AK, WY]
+    )
+
+    house = Organization.objects.get(jurisdiction_id=AK, classification="lower")
+    assert _tags(f'{{ people(memberOf: "{house.id}") {{ totalCount }} }}') == [AK]
+
+    # anything that can't be pinned to jurisdictions depends on all of them
+    assert _tags("{ bills { totalCount } }") == [ALL_JURISDICTIONS]
+    assert _tags(
+        '{ bills(jurisdiction: "Alaska") { totalCount } jurisdictions { totalCount } }'
+    ) == [ALL_JURISDICTIONS]
+    assert _tags('{ jurisdiction(name: "Nowhere") { name } }') == [ALL_JURISDICTIONS]
+
+
+def _graphql(client, query):
+    response = client.post(
+        "/graphql",
+        json.dumps({"query": query}),
+        content_type="application/json",
+        HTTP_ORIGIN="http://testserver",
+    )
+    return response.json()
+
+
+AK_BILLS = '{ bills(jurisdiction: "Alaska", first: 50) { edges { node { title } } } }'
+
+
+@pytest.mark.django_db
+@override_settings(GRAPHQL_RESULT_CACHE_TIMEOUT=60)
+def test_result_cached(client, django_assert_num_queries):
+    result = _graphql(client, AK_BILLS)
+    with django_assert_num_queries(0):
+        # whitespace doesn't make for a different query
+        assert _graphql(client, AK_BILLS.replace(" ", "  ")) == result
+    assert result["extensions"]["cost"]["requested"] == 51
+
+
+@pytest.mark.django_db
+@override_settings(GRAPHQL_RESULT_CACHE_TIMEOUT=60)
+def test_result_invalidated(client, django_assert_num_queries):
+    _graphql(client, AK_BILLS)
+
+    # another jurisdiction's bills don't matter
+    bill = Bill.objects.filter(legislative_session__jurisdiction_id=WY)[0]
+    bill.title = "Updated"
+    bill.save()
+    with django_assert_num_queries(0):
+        _graphql(client, AK_BILLS)
+
+    bill = Bill.objects.filter(legislative_session__jurisdiction_id=AK)[0]
+    bill.title = "Updated"
+    bill.save()
+    result = _graphql(client, AK_BILLS)
+    titles = [edge["node"]["title"] for edge in result["data"]["bills"]["edges"]]
+    assert "Updated" in titles
+
+
+@pytest.mark.django_db
+@override_settings(GRAPHQL_RESULT_CACHE_TIMEOUT=60)
+def test_party_membership_invalidates(client):
+    house = Organization.objects.get(jurisdiction_id=AK, classification="lower")
+    query = (
+        '{ people(memberOf: "%s", first: 50) { edges { node { '
+        "currentMemberships { endDate organization { classification } } } } } }"
+        % house.id
+    )
+    _graphql(client, query)
+
+    # parties don't belong to a jurisdiction, but their members do
+    membership = Membership.objects.filter(
+        organization__classification="party", person__current_jurisdiction_id=AK
+    )[0]
+    membership.end_date = "2020-01-01"
+    membership.save()
+    result = _graphql(client, query)
+    end_dates = [
+        m["endDate"]
+        for edge in result["data"]["people"]["edges"]
+        for m in edge["node"]["currentMemberships"]
+    ]
+    assert "2020-01-01" in end_dates
+
+
+@pytest.mark.django_db
+@override_settings(GRAPHQL_RESULT_CACHE_TIMEOUT=60)
+def test_errors_not_cached(client, django_assert_num_queries):
+    query = '{ jurisdiction(name: "Nowhere") { name } bills(first: 5) { totalCount } }'
+    _graphql(client, query)
+    # ran again: counting & fetching bills
+    with django_assert_num_queries(2):
+        result = _graphql(client, query)
+    assert result["errors"]
+
+
+@pytest.mark.django_db
+def test_result_cache_off(client, django_assert_num_queries):
+    _graphql(client, AK_BILLS)
+    with django_assert_num_queries(1):
+        _graphql(client, AK_BILLS)
@@ -0,0 +1,106 @@
+import json
+import threading
+from types import SimpleNamespace
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from graphapi.schema import schema
+from .utils import populate_db
+from ..tracing import Trace, TracingMiddleware
+
+QUERY = "{ bills(first: 5) { edges { node { title sponsorships { name } } } } }"
+
+
+@pytest.mark.django_db
+def setup():
+    populate_db()
+
+
+class Context:
+    pass
+
+
+def _create_key(key, is_staff):
+    u = User.objects.create(username=key, is_staff=is_staff)
+    u.profile.api_key = key
+    u.profile.api_tier = "unlimited"
+    u.profile.save()
+
+
+def _graphql(client, key):
+    caches["default"].clear()
+    response = client.post(
+        "/graphql",
+        json.dumps({"query": QUERY}),
+        content_type="application/json",
+        HTTP_X_API_KEY=key,
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_trace_paths():
+    context = Context()
+    context.graphql_trace = Trace()
+    result = schema.execute(
+        QUERY, context_value=context, middleware=[TracingMiddleware()]
+    )
+    assert result.errors is None
+
+    summary = context.graphql_trace.summary()
+    resolvers = {r["path"]: r for r in summary["resolvers"]}
+    # list indexes are aggregated away
+    assert resolvers["bills.edges.node.title"]["calls"] == 5
+    assert resolvers["bills.edges.node.sponsorships"]["calls"] == 5
+    assert resolvers["bills"]["calls"] == 1
+
+
+@pytest.mark.django_db
+def test_trace_queries_per_thread():
+    trace = Trace()
+    info = SimpleNamespace(context=SimpleNamespace(graphql_trace=trace), path=["a"])
+
+    def query():
+        return trace.count_query(lambda *args: None, "SELECT 1", None, False, {})
+
+    def resolve(root, info):
+        # another root field's queries, made while this one is resolving
+        other = threading.Thread(target=lambda: [query() for _ in range(3)])
+        other.start()
+        other.join()
+        query()
+
+    TracingMiddleware().resolve(resolve, None, info)
+    resolvers = {r["path"]: r for r in trace.summary()["resolvers"]}
+    assert resolvers["a"]["queries"] == 1
+    assert trace.summary()["queries"] == 4
+
+
+@pytest.mark.django_db
+def test_trace_without_context():
+    # nothing is recorded, and nothing breaks, when a request isn't traced
+    result = schema.execute(QUERY, middleware=[TracingMiddleware()])
+    assert result.errors is None
+
+
+@pytest.mark.django_db
+def test_tracing_extension_for_staff(client):
+    _create_key("staff", True)
+    tracing = _graphql(client, "staff")["extensions"]["tracing"]
+    assert tracing["queries"] > 0
+    resolvers = {r["path"]: r for r in tracing["resolvers"]}
+    # the connection's queries happen in its resolver
+    assert resolvers["bills"]["queries"] > 0
+
+
+@pytest.mark.django_db
+def test_no_tracing_extension_for_others(client, settings, caplog):
+    settings.GRAPHQL_TRACING = True
+    _create_key("user", False)
+    data = _graphql(client, "user")
+    assert "tracing" not in data["extensions"]
+    assert "cost" in data["extensions"]
+    # but with GRAPHQL_TRACING on the summary is still logged
+    assert "graphql trace" in caplog.text
+    assert "bills.edges.node.sponsorships" in caplog.text
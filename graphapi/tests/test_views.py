@@ -0,0 +1,115 @@
+import json
+import time
+import pytest
+from django.test import override_settings
+from graphql.error import GraphQLSyntaxError
+from graphapi.documents import CachedDocumentBackend, query_hash
+from graphapi.schema import schema
+from .utils import populate_db
+
+
+@pytest.mark.django_db
+def setup():
+    populate_db()
+
+
+QUERY = '{ jurisdiction(name: "Alaska") { name } }'
+
+
+@pytest.mark.django_db
+def test_document_backend_caches():
+    backend = CachedDocumentBackend(max_size=2)
+    document = backend.document_from_string(schema, QUERY)
+    assert backend.document_from_string(schema, QUERY) is document
+
+    backend.document_from_string(schema, '{ a: jurisdiction(name: "x") { id } }')
+    backend.document_from_string(schema, QUERY)
+    backend.document_from_string(schema, '{ b: jurisdiction(name: "x") { id } }')
+    # QUERY was used most recently so the first alias query was evicted
+    assert len(backend.documents) == 2
+    assert backend.document_from_string(schema, QUERY) is document
+
+
+@pytest.mark.django_db
+def test_document_backend_invalid():
+    backend = CachedDocumentBackend()
+    document = backend.document_from_string(schema, "{ nonsense }")
+    result = document.execute()
+    assert result.invalid
+    assert "nonsense" in result.errors[0].message
+
+    with pytest.raises(GraphQLSyntaxError):
+        backend.document_from_string(schema, "{ unclosed ")
+    assert len(backend.documents) == 1
+
+
+def _graphql(client, method, **params):
+    # the origin header marks the request as internal so no key is needed
+    if method == "get":
+        params = {
+            k: json.dumps(v) if isinstance(v, dict) else v for k, v in params.items()
+        }
+        response = client.get("/graphql", params, HTTP_ORIGIN="http://testserver")
+    else:
+        response = client.post(
+            "/graphql",
+            json.dumps(params),
+            content_type="application/json",
+            HTTP_ORIGIN="http://testserver",
+        )
+    return response.status_code, response.json()
+
+
+@pytest.mark.django_db
+def test_view_query(client):
+    status, result = _graphql(client, "post", query=QUERY)
+    assert status == 200
+    assert result["data"]["jurisdiction"]["name"] == "Alaska"
+
+
+@pytest.mark.django_db
+def test_persisted_query(client):
+    query = '{ jurisdiction(name: "Wyoming") { name } }'
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query)}}
+
+    status, result = _graphql(client, "get", extensions=extensions)
+    assert result["errors"][0]["message"] == "PersistedQueryNotFound"
+
+    status, result = _graphql(client, "post", query=query, extensions=extensions)
+    assert result["data"]["jurisdiction"]["name"] == "Wyoming"
+
+    status, result = _graphql(client, "get", extensions=extensions)
+    assert status == 200
+    assert result["data"]["jurisdiction"]["name"] == "Wyoming"
+
+
+@pytest.mark.django_db
+@override_settings(GRAPHQL_PERSISTED_QUERY_TIMEOUT=60)
+def test_persisted_query_expires(client, monkeypatch):
+    query = '{ jurisdiction(name: "Alaska") { id } }'
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash(query)}}
+    _graphql(client, "post", query=query, extensions=extensions)
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    status, result = _graphql(client, "get", extensions=extensions)
+    assert result["errors"][0]["message"] == "PersistedQueryNotFound"
+
+
+@pytest.mark.django_db
+def test_persisted_query_hash_mismatch(client):
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": "abc"}}
+    status, result = _graphql(client, "post", query=QUERY, extensions=extensions)
+    assert status == 400
+    assert "does not match" in result["errors"][0]["message"]
+
+
+@pytest.mark.django_db
+def test_cost_in_extensions(client):
+    status, data = _graphql(client, "post", query=QUERY)
+    assert status == 200
+    assert data["extensions"]["cost"] == {
+        "requested": 1,
+        "limit": 5000,
+        "remaining": 4999,
+    }
@@ -11,6 +11,8 @@ from openstates.data.models import (
     SearchableBill,
 )
 from openstates.importers.computed_fields import update_bill_fields
+from public.models import CurrentMembership
+from utils.metadata import registry
 
 
 def make_random_bill(name):
@@ -258,6 +260,11 @@ def populate_db():
     ):
         update_bill_fields(bill)
 
+    # as is done after an import
+    CurrentMembership.refresh()
+    # & as a running site would already have loaded
+    registry.warm()
+
 
 def populate_unicam():
     d = Division.objects.create(id="ocd-division/country:us/state:ne", name="Nebraska")
@@ -279,3 +286,4 @@ def populate_unicam():
 
     make_person("Quincy Quip", "Nebraska", "legislature", "1", "Nonpartisan")
     make_person("Wendy Wind", "Nebraska", "legislature", "2", "Nonpartisan")
+    CurrentMembership.refresh()
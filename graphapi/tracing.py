@@ -0,0 +1,88 @@
+import time
+import threading
+from collections import defaultdict
+
+
+class Trace:
+    """
+    wall time & SQL queries per resolver path for one operation
+
+    list indexes are dropped from paths so that e.g. every bill's sponsorships
+    are aggregated under bills.edges.node.sponsorships
+
+    root fields may be resolved in several threads at once (see execution.py)
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.resolvers = defaultdict(
+            lambda: {"calls": 0, "duration": 0.0, "queries": 0}
+        )
+        self.queries = 0
+        # per thread as well, so that a resolver's queries can be told apart from
+        # those of root fields running alongside it
+        self.local = threading.local()
+
+    def count_query(self, execute, sql, params, many, context):
+        with self.lock:
+            self.queries += 1
+        self.local.queries = self.thread_queries() + 1
+        return execute(sql, params, many, context)
+
+    def thread_queries(self):
+        """queries counted so far in the calling thread"""
+        return getattr(self.local, "queries", 0)
+
+    def record(self, path, duration, queries):
+        path = ".".join(str(p) for p in path if not isinstance(p, int))
+        with self.lock:
+            resolver = self.resolvers[path]
+            resolver["calls"] += 1
+            resolver["duration"] += duration
+            resolver["queries"] += queries
+
+    def summary(self, top=None):
+        resolvers = sorted(
+            ({"path": path, **totals} for path, totals in self.resolvers.items()),
+            key=lambda r: (r["duration"], r["queries"]),
+            reverse=True,
+        )
+        return {
+            "duration": time.perf_counter() - self.start,
+            "queries": self.queries,
+            "resolvers": resolvers[:top],
+        }
+
+
+def start_trace(request):
+    """trace the GraphQL operation run for request, if TracingMiddleware is installed"""
+    request.graphql_trace = Trace()
+    return request.graphql_trace
+
+
+class TracingMiddleware(object):
+    """
+    records each resolver in the context's graphql_trace, and does nothing if
+    there isn't one so it can stay installed
+
+    only the resolver call itself is timed, lists are completed by graphene
+    afterwards & batched loaders run when their promises are resolved, so their
+    queries count towards the operation's total but not towards any one path
+    """
+
+    def resolve(self, next, root, info, **args):
+        trace = getattr(info.context, "graphql_trace", None)
+        if trace is None:
+            return next(root, info, **args)
+
+        queries = trace.thread_queries()
+        start = time.perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            trace.record(
+                info.path,
+                time.perf_counter() - start,
+                trace.thread_queries() - queries,
+            )
@@ -1,8 +1,78 @@
-from graphene_django.views import GraphQLView
-from profiles.verifier import verify_request
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, connection
+from django.http import HttpResponse, HttpResponseBadRequest
+from graphene_django.views import GraphQLView, HttpError
+from graphql.execution import ExecutionResult
+from structlog import get_logger
+from profiles.models import Profile
+from profiles.verifier import get_key_from_request, verify_request
+from .documents import CachedDocumentBackend, query_hash
+from .execution import execute_concurrently
+from .result_cache import get_result, result_cache_key, set_result
+from .tracing import start_trace
 
 GraphQLView.graphiql_template = "graphene_graphiql_explorer/graphiql.html"
 
+# shared by every request this process handles
+document_backend = CachedDocumentBackend(max_size=256)
+concurrent_document_backend = CachedDocumentBackend(
+    max_size=256, execute=execute_concurrently
+)
+
+logger = get_logger("openstates")
+
+
+def get_persisted_query(request, data, query):
+    """
+    handle an (Apollo style) persisted query, if one was sent
+
+    sending a query along with its sha256Hash registers it, after which the hash
+    alone (e.g. in a CDN cacheable GET) is enough to run the query until it
+    expires or is evicted, when the client is told to register it again
+    """
+    extensions = request.GET.get("extensions") or data.get("extensions")
+    if not extensions:
+        return query
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+    persisted = extensions.get("persistedQuery")
+    if not persisted:
+        return query
+
+    sha = persisted.get("sha256Hash", "")
+    cache_key = f"graphql-persisted~{sha}"
+    if query:
+        if query_hash(query) != sha:
+            raise HttpError(
+                HttpResponseBadRequest("provided sha256Hash does not match query")
+            )
+        caches["default"].set(
+            cache_key, query, settings.GRAPHQL_PERSISTED_QUERY_TIMEOUT
+        )
+        return query
+
+    query = caches["default"].get(cache_key)
+    if query is None:
+        # clients respond to this by sending the query along with the hash
+        raise HttpError(HttpResponse(), "PersistedQueryNotFound")
+    return query
+
+
+def is_staff_key(key):
+    if not key:
+        return False
+    return caches["default"].get_or_set(
+        f"{key}~staff",
+        lambda: Profile.objects.filter(api_key=key, user__is_staff=True).exists(),
+        10 * 60,
+    )
+
 
 class KeyedGraphQLView(GraphQLView):
     def get_response(self, request, data, show_graphiql=False):
@@ -14,4 +84,107 @@ class KeyedGraphQLView(GraphQLView):
             if error:
                 return error, error.status_code
 
-        return super().get_response(request, data, show_graphiql)
+        # staff get the trace back, otherwise it is only logged if enabled
+        request.graphql_show_trace = is_staff_key(get_key_from_request(request))
+        if not (request.graphql_show_trace or settings.GRAPHQL_TRACING):
+            return super().get_response(request, data, show_graphiql)
+
+        trace = start_trace(request)
+        with connection.execute_wrapper(trace.count_query):
+            result = super().get_response(request, data, show_graphiql)
+        summary = trace.summary(top=10)
+        logger.info(
+            "graphql trace",
+            api_key=get_key_from_request(request),
+            duration=summary["duration"],
+            queries=summary["queries"],
+            resolvers=summary["resolvers"],
+        )
+        return result
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        # traced requests always run so that there's something to trace
+        if (
+            not settings.GRAPHQL_RESULT_CACHE_TIMEOUT
+            or not query
+            or getattr(request, "graphql_trace", None)
+        ):
+            return super().execute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+
+        try:
+            document = self.get_backend(request).document_from_string(
+                self.schema, query
+            )
+            key = result_cache_key(document, operation_name, variables)
+        except Exception:
+            # the parent reports what's wrong with the query
+            key = None
+        cached = get_result(key) if key else None
+        if cached is not None:
+            request.graphql_cost = cached["cost"]
+            return ExecutionResult(data=cached["data"])
+
+        result = super().execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if key and result and not result.errors:
+            set_result(key, result.data, getattr(request, "graphql_cost", None))
+        return result
+
+    def get_backend(self, request):
+        return document_backend
+
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, id = super().get_graphql_params(request, data)
+        query = get_persisted_query(request, data, query)
+        return query, variables, operation_name, id
+
+    def json_encode(self, request, d, pretty=False):
+        # set by QueryProtectionMiddleware
+        cost = getattr(request, "graphql_cost", None)
+        if cost is not None:
+            d.setdefault("extensions", {})["cost"] = cost
+        if getattr(request, "graphql_show_trace", False):
+            d.setdefault("extensions", {})["tracing"] = request.graphql_trace.summary()
+        return super().json_encode(request, d, pretty)
+
+
+class AsyncKeyedGraphQLView(KeyedGraphQLView):
+    """
+    KeyedGraphQLView as an async view, for serving under ASGI
+
+    the ORM is synchronous, so the request (key verification included) is still
+    handled in a worker thread, but the event loop isn't tied up while it is &
+    the root fields of a query are resolved concurrently
+    """
+
+    def get_backend(self, request):
+        return concurrent_document_backend
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        sync_view = super().as_view(**initkwargs)
+
+        def handle(request, *args, **kwargs):
+            # each worker thread has its own connection, recycled the way Django
+            # does around a synchronous request
+            close_old_connections()
+            try:
+                return sync_view(request, *args, **kwargs)
+            finally:
+                close_old_connections()
+
+        # not thread sensitive: Django's ASGI handler would otherwise run every
+        # request in the same single thread, one at a time
+        handle = sync_to_async(handle, thread_sensitive=False)
+
+        async def view(request, *args, **kwargs):
+            return await handle(request, *args, **kwargs)
+
+        # set here since csrf_exempt() would hide that the view is async
+        view.csrf_exempt = True
+        return view
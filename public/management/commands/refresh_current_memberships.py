@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from public.models import CurrentMembership
+
+
+class Command(BaseCommand):
+    help = (
+        "recompute current memberships if people were imported or the date changed "
+        "since the last refresh, run every few minutes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="refresh even if nothing changed"
+        )
+
+    def handle(self, *args, **options):
+        if options["force"]:
+            CurrentMembership.refresh()
+        elif not CurrentMembership.refresh_if_outdated():
+            print("current memberships are up to date")
+            return
+        print(f"{CurrentMembership.objects.count()} current memberships")
@@ -0,0 +1,67 @@
+# Generated by Django 3.2.14 on 2026-10-18 19:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("data", "0044_bill_citations"),
+    ]
+
+    # the view pins the columns of opencivicdata_membership, _post & _organization
+    # it selects, openstates-core migrations that alter them will fail until the
+    # view is dropped beforehand & recreated afterwards
+    operations = [
+        migrations.RunSQL(
+            """
+            CREATE MATERIALIZED VIEW public_currentmembership AS
+            SELECT m.id AS membership_id, m.person_id, m.organization_id, m.post_id,
+                   post.division_id, o.classification, o.jurisdiction_id
+            FROM opencivicdata_membership m
+            JOIN opencivicdata_organization o ON o.id = m.organization_id
+            LEFT JOIN opencivicdata_post post ON post.id = m.post_id
+            WHERE (m.start_date = ''
+                   OR m.start_date <= to_char(current_date, 'YYYY-MM-DD'))
+              AND (m.end_date = ''
+                   OR m.end_date >= to_char(current_date, 'YYYY-MM-DD'));
+
+            -- REFRESH ... CONCURRENTLY needs a unique index
+            CREATE UNIQUE INDEX public_currentmembership_pk
+                ON public_currentmembership (membership_id);
+            CREATE INDEX public_currentmembership_person
+                ON public_currentmembership (person_id);
+            CREATE INDEX public_currentmembership_organization
+                ON public_currentmembership (organization_id);
+            CREATE INDEX public_currentmembership_division
+                ON public_currentmembership (division_id);
+            CREATE INDEX public_currentmembership_jurisdiction
+                ON public_currentmembership (jurisdiction_id, classification);
+            """,
+            "DROP MATERIALIZED VIEW public_currentmembership",
+        ),
+        migrations.CreateModel(
+            name="CurrentMembership",
+            fields=[
+                (
+                    "membership",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="current",
+                        serialize=False,
+                        to="data.membership",
+                    ),
+                ),
+                ("classification", models.CharField(max_length=100)),
+                ("jurisdiction_id", models.CharField(max_length=300)),
+            ],
+            options={
+                "db_table": "public_currentmembership",
+                "managed": False,
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+import datetime
+from django.core.cache import caches
+from django.db import connection, models
+from django.db.models import Max
+from openstates.data.models import (
+    Division,
+    Jurisdiction,
+    Membership,
+    Organization,
+    Person,
+    Post,
+)
+
+
+class CurrentMembership(models.Model):
+    """
+    memberships that are current as of the last refresh()
+
+    a materialized view over Membership, so that finding current members (e.g. by
+    district) is an indexed lookup instead of comparing date strings every time
+    """
+
+    membership = models.OneToOneField(
+        Membership,
+        primary_key=True,
+        related_name="current",
+        on_delete=models.DO_NOTHING,
+    )
+    person = models.ForeignKey(
+        Person,
+        null=True,
+        related_name="current_membership_set",
+        on_delete=models.DO_NOTHING,
+    )
+    organization = models.ForeignKey(
+        Organization, related_name="+", on_delete=models.DO_NOTHING
+    )
+    post = models.ForeignKey(
+        Post, null=True, related_name="+", on_delete=models.DO_NOTHING
+    )
+    division = models.ForeignKey(
+        Division, null=True, related_name="+", on_delete=models.DO_NOTHING
+    )
+    classification = models.CharField(max_length=100)
+    jurisdiction_id = models.CharField(max_length=300)
+
+    class Meta:
+        managed = False
+        db_table = "public_currentmembership"
+
+    @classmethod
+    def refresh(cls):
+        """recompute current memberships, to be run after each import (and daily)"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"REFRESH MATERIALIZED VIEW CONCURRENTLY {cls._meta.db_table}"
+            )
+
+    @classmethod
+    def refresh_if_outdated(cls):
+        """
+        refresh() if people have been imported or the date has changed since the
+        last time this did, returns whether it did
+
+        imports are done elsewhere, but they record when people were last
+        imported on each jurisdiction, so running this often picks them up
+        """
+        latest = Jurisdiction.objects.aggregate(latest=Max("latest_people_update"))
+        version = f"{datetime.date.today()}~{latest['latest']}"
+        cache = caches["default"]
+        if cache.get(REFRESHED_VERSION_KEY) == version:
+            return False
+        cls.refresh()
+        cache.set(REFRESHED_VERSION_KEY, version, None)
+        return True
+
+
+REFRESHED_VERSION_KEY = "current-memberships~refreshed"
@@ -28,7 +28,7 @@ def sortable_bills(kansas):
     b.save()
 
 
-BILLS_QUERY_COUNT = 7
+BILLS_QUERY_COUNT = 5
 ALASKA_BILLS = 12
 
 
@@ -201,7 +201,7 @@ def test_bills_view_bad_page(client):
 
 @pytest.mark.django_db
 def test_bill_view(client, django_assert_num_queries):
-    with django_assert_num_queries(17):
+    with django_assert_num_queries(15):
         resp = client.get("/ak/bills/2018/HB1/")
     assert resp.status_code == 200
     assert resp.context["state"] == "ak"
@@ -224,7 +224,7 @@ def test_bill_view(client, django_assert_num_queries):
 @pytest.mark.django_db
 def test_vote_view(client, django_assert_num_queries):
     vid = VoteEvent.objects.get(motion_text="Vote on House Passage").id.split("/")[1]
-    with django_assert_num_queries(7):
+    with django_assert_num_queries(6):
         resp = client.get(f"/vote/{vid}/")
     assert resp.status_code == 200
     assert resp.context["state"] == "ak"
@@ -0,0 +1,69 @@
+import pytest
+from django.core.cache import caches
+from django.utils import timezone
+from openstates.data.models import Jurisdiction, Membership, Person
+from graphapi.tests.utils import populate_db
+from public.models import REFRESHED_VERSION_KEY, CurrentMembership
+from utils.orgs import get_chambers_from_abbr
+from utils.people import current_legislators_with_roles
+
+
+@pytest.mark.django_db
+def setup():
+    populate_db()
+
+
+@pytest.mark.django_db
+def test_current_memberships():
+    amanda = CurrentMembership.objects.filter(person__name="Amanda Adams")
+    assert {m.classification for m in amanda} == {"lower", "party"}
+    district = amanda.get(classification="lower")
+    assert district.division_id == "ocd-division/country:us/state:ak/sldl:1"
+    assert district.jurisdiction_id == "ocd-jurisdiction/country:us/state:ak/government"
+
+    # ended memberships aren't current
+    assert not CurrentMembership.objects.filter(person__name="Rhonda Retired")
+    assert CurrentMembership.objects.filter(person__name="Ellen Evil").count() == 2
+
+
+@pytest.mark.django_db
+def test_refresh():
+    amanda = Membership.objects.get(
+        person__name="Amanda Adams", organization__classification="lower"
+    )
+    amanda.end_date = "2017-01-01"
+    amanda.save()
+    # nothing changes until the next refresh
+    assert CurrentMembership.objects.filter(membership=amanda).exists()
+    CurrentMembership.refresh()
+    assert not CurrentMembership.objects.filter(membership=amanda).exists()
+
+
+@pytest.mark.django_db
+def test_refresh_if_outdated():
+    caches["default"].delete(REFRESHED_VERSION_KEY)
+    assert CurrentMembership.refresh_if_outdated()
+    assert not CurrentMembership.refresh_if_outdated()
+
+    amanda = Membership.objects.get(
+        person__name="Amanda Adams", organization__classification="lower"
+    )
+    amanda.end_date = "2017-01-01"
+    amanda.save()
+    # as an import of people would
+    Jurisdiction.objects.filter(id=amanda.organization.jurisdiction_id).update(
+        latest_people_update=timezone.now()
+    )
+    assert CurrentMembership.refresh_if_outdated()
+    assert not CurrentMembership.objects.filter(membership=amanda).exists()
+
+
+@pytest.mark.django_db
+def test_current_legislators_with_roles(django_assert_num_queries):
+    chambers = get_chambers_from_abbr("ak")
+    with django_assert_num_queries(1):
+        people = list(current_legislators_with_roles(chambers))
+    assert {p.name for p in people} == {
+        p.name for p in Person.objects.current_legislators_with_roles(chambers)
+    }
+    assert len(people) == 6
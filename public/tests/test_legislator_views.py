@@ -11,7 +11,7 @@ def setup():
 
 @pytest.mark.django_db
 def test_legislators_view(client, django_assert_num_queries):
-    with django_assert_num_queries(5):
+    with django_assert_num_queries(1):
         resp = client.get("/ak/legislators/")
     assert resp.status_code == 200
     assert resp.context["state"] == "ak"
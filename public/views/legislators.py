@@ -1,10 +1,10 @@
 from django.shortcuts import get_object_or_404, render, redirect
 from django.http import JsonResponse
 from graphapi.schema import schema
-from openstates.data.models import Person, Bill
+from openstates.data.models import Bill
 from utils.common import decode_uuid, jid_to_abbr, pretty_url
 from utils.orgs import get_chambers_from_abbr
-from utils.people import person_as_dict
+from utils.people import person_as_dict, current_legislators_with_roles
 
 
 def _people_from_lat_lon(lat, lon):
@@ -76,10 +76,7 @@ def find_your_legislator(request):
 def legislators(request, state):
     chambers = get_chambers_from_abbr(state)
 
-    legislators = [
-        person_as_dict(p)
-        for p in Person.objects.current_legislators_with_roles(chambers)
-    ]
+    legislators = [person_as_dict(p) for p in current_legislators_with_roles(chambers)]
 
     chambers = {c.classification: c.name for c in chambers}
 
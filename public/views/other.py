@@ -8,7 +8,7 @@ from django.shortcuts import render
 from openstates.data.models import Bill, Organization, Person
 from utils.common import abbr_to_jid, states, sessions_with_bills, jid_to_abbr
 from utils.bills import search_bills, EXCLUDED_CLASSIFICATIONS
-from utils.people import person_as_dict
+from utils.people import person_as_dict, current_legislators_with_roles
 
 
 def styleguide(request):
@@ -75,7 +75,7 @@ def state(request, state):
         chambers = [legislature]
 
     # legislators
-    legislators = Person.objects.current_legislators_with_roles(chambers)
+    legislators = current_legislators_with_roles(chambers)
 
     for chamber in chambers:
         parties = []
@@ -0,0 +1,242 @@
+"""
+benchmark bulk exports against synthetic sessions
+
+synthetic sessions are written to a throwaway jurisdiction (state:zz by default)
+and are deleted again when the run is over unless asked to keep them, don't point
+this at a database you care about
+
+    ./manage.py benchmark_export --bills 50000 --votes-per-bill 1 --voters-per-vote 40
+"""
+import os
+import time
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from django.db import connection, connections, transaction
+from openstates.data.models import (
+    Division,
+    Jurisdiction,
+    LegislativeSession,
+    Organization,
+    Bill,
+    BillAction,
+    BillSource,
+    BillSponsorship,
+    BillVersion,
+    VoteEvent,
+    VoteCount,
+    PersonVote,
+)
+from bulk.management.commands.bulk_export import (
+    export_session_csv,
+    export_session_json,
+)
+from utils.common import abbr_to_jid
+
+EXPORTS = {"csv": export_session_csv, "json": export_session_json}
+# bills (and their related rows) created per round of bulk inserts
+GENERATE_BATCH_SIZE = 1000
+
+
+def create_synthetic_jurisdiction(abbr="zz", session="2020"):
+    """set up a jurisdiction shaped like the kansas test fixture"""
+    d = Division.objects.create(
+        id=f"ocd-division/country:us/state:{abbr}", name=f"Synthetic {abbr}"
+    )
+    j = Jurisdiction.objects.create(
+        id=abbr_to_jid(abbr), name=f"Synthetic {abbr}", division=d
+    )
+    j.legislative_sessions.create(
+        identifier=session, name=session, start_date=f"{session}-01-01"
+    )
+    leg = Organization.objects.create(
+        jurisdiction=j, classification="legislature", name="Synthetic Legislature"
+    )
+    for chamber in ("lower", "upper"):
+        Organization.objects.create(
+            jurisdiction=j, parent=leg, classification=chamber, name=chamber
+        )
+    return j
+
+
+def create_synthetic_bills(
+    abbr="zz",
+    session="2020",
+    *,
+    bills=1000,
+    actions_per_bill=5,
+    sponsors_per_bill=2,
+    votes_per_bill=1,
+    voters_per_vote=40,
+):
+    """
+    add bills to a session with the same shape as testutils.factories
+
+    rows are bulk inserted GENERATE_BATCH_SIZE bills at a time, creating them one
+    by one like create_test_bill/create_test_vote would take hours at full scale
+    """
+    sobj = LegislativeSession.objects.get(
+        jurisdiction_id=abbr_to_jid(abbr), identifier=session
+    )
+    chambers = list(
+        Organization.objects.filter(
+            jurisdiction_id=sobj.jurisdiction_id, classification__in=["lower", "upper"]
+        )
+    )
+
+    for start in range(0, bills, GENERATE_BATCH_SIZE):
+        with transaction.atomic():
+            batch = Bill.objects.bulk_create(
+                Bill(
+                    identifier=f"HB {n}",
+                    title="Random Bill",
+                    legislative_session=sobj,
+                    from_organization=chambers[n % len(chambers)],
+                    subject=[],
+                )
+                for n in range(start, min(start + GENERATE_BATCH_SIZE, bills))
+            )
+            BillAction.objects.bulk_create(
+                BillAction(
+                    bill=b,
+                    description="Something",
+                    order=n,
+                    organization=b.from_organization,
+                    date="2020-06-01",
+                )
+                for b in batch
+                for n in range(actions_per_bill)
+            )
+            BillSponsorship.objects.bulk_create(
+                BillSponsorship(bill=b, name="Someone")
+                for b in batch
+                for n in range(sponsors_per_bill)
+            )
+            BillVersion.objects.bulk_create(
+                BillVersion(bill=b, note="Version") for b in batch
+            )
+            BillSource.objects.bulk_create(
+                BillSource(bill=b, url="http://example.com") for b in batch
+            )
+            votes = VoteEvent.objects.bulk_create(
+                VoteEvent(
+                    bill=b,
+                    identifier="A Vote Occurred",
+                    organization=b.from_organization,
+                    legislative_session=sobj,
+                )
+                for b in batch
+                for n in range(votes_per_bill)
+            )
+            VoteCount.objects.bulk_create(
+                VoteCount(vote_event=v, option=option, value=voters_per_vote // 2)
+                for v in votes
+                for option in ("yes", "no")
+            )
+            PersonVote.objects.bulk_create(
+                (
+                    PersonVote(
+                        vote_event=v,
+                        option="yes" if n % 2 else "no",
+                        voter_name=f"Voter {n}",
+                    )
+                    for v in votes
+                    for n in range(voters_per_vote)
+                ),
+                batch_size=10000,
+            )
+
+
+def delete_synthetic_jurisdiction(abbr="zz"):
+    # most of the foreign keys up to the jurisdiction are protected, so go bottom up
+    jid = abbr_to_jid(abbr)
+    VoteEvent.objects.filter(legislative_session__jurisdiction_id=jid).delete()
+    Bill.objects.filter(legislative_session__jurisdiction_id=jid).delete()
+    LegislativeSession.objects.filter(jurisdiction_id=jid).delete()
+    Organization.objects.filter(jurisdiction_id=jid, parent__isnull=False).delete()
+    Organization.objects.filter(jurisdiction_id=jid).delete()
+    Jurisdiction.objects.filter(id=jid).delete()
+    Division.objects.filter(id=f"ocd-division/country:us/state:{abbr}").delete()
+
+
+def measure(func, *args, **kwargs):
+    """
+    call func, returning its result along with the wall time, peak RSS & query count
+
+    peak RSS is the high-water mark of the whole process so is only meaningful
+    when the call is made in a fresh process, as run_benchmarks does
+    """
+    queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    with connection.execute_wrapper(count_queries):
+        result = func(*args, **kwargs)
+    wall_time = time.perf_counter() - start
+    # ru_maxrss is in KB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result, {
+        "wall_time": wall_time,
+        "peak_rss_mb": peak_rss_mb,
+        "queries": queries,
+    }
+
+
+def _measure_export(data_type, state, session):
+    filename, stats = measure(EXPORTS[data_type], state, session)
+    if filename:
+        stats["size_mb"] = os.path.getsize(filename) / 1024 / 1024
+        os.remove(filename)
+    return stats
+
+
+def _in_child(func, *args, **kwargs):
+    """run func in a fresh forked process so its memory use is measured alone"""
+    # don't hand an open connection to the forked worker
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=connections.close_all,
+    ) as pool:
+        return pool.submit(func, *args, **kwargs).result()
+
+
+def run_benchmarks(state, session, data_types=("csv", "json"), repeat=1):
+    """
+    time each export of an existing session, each run in its own process
+
+    returns a list of dicts with data_type, wall_time, peak_rss_mb, queries & size_mb
+    """
+    results = []
+    for data_type in data_types:
+        for n in range(repeat):
+            stats = _in_child(_measure_export, data_type, state, session)
+            results.append({"data_type": data_type, **stats})
+    return results
+
+
+def run_synthetic_benchmarks(
+    abbr="zz",
+    session="2020",
+    data_types=("csv", "json"),
+    repeat=1,
+    keep=False,
+    **scale,
+):
+    """
+    generate a synthetic session at the given scale & benchmark exporting it
+
+    scale is passed to create_synthetic_bills
+    """
+    _in_child(create_synthetic_jurisdiction, abbr, session)
+    try:
+        _in_child(create_synthetic_bills, abbr, session, **scale)
+        return run_benchmarks(abbr, session, data_types, repeat)
+    finally:
+        if not keep:
+            _in_child(delete_synthetic_jurisdiction, abbr)
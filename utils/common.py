@@ -2,9 +2,9 @@ import us
 import uuid
 import base62
 from django.utils.text import slugify
-from django.db.models import Count
 from openstates.data.models import Person
-from openstates.data.models import Bill, VoteEvent, LegislativeSession
+from openstates.data.models import Bill, VoteEvent
+from .metadata import registry
 
 # Metadata for states that are available in the platform
 states = sorted(us.STATES + [us.states.PR, us.states.DC], key=lambda s: s.name)
@@ -54,9 +54,5 @@ def pretty_url(obj):
 
 
 def sessions_with_bills(jid):
-    return (
-        LegislativeSession.objects.filter(jurisdiction_id=jid)
-        .annotate(bill_count=Count("bills"))
-        .filter(bill_count__gt=0)
-        .order_by("-start_date", "-identifier")
-    )
+    """sessions of a jurisdiction that have bills, newest first, with a bill_count"""
+    return registry.sessions_with_bills(jid)
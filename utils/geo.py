@@ -1,12 +1,180 @@
+import os
+import re
+import glob
+import json
+import threading
+from functools import lru_cache
 import requests
+from django.conf import settings
 from openstates import metadata
 
+# decimal places points are rounded to before lookup so that nearby points share
+# a cache entry. rounding moves a point up to ~6m per axis, so a point that close
+# to a boundary may resolve to the division on the other side of it
+COORDINATE_PRECISION = 4
+# entries per node of the spatial index
+NODE_CAPACITY = 16
 
-def coords_to_divisions(lat, lng):
+
+def _bbox(rings):
+    xs = [x for ring in rings for x, y in ring]
+    ys = [y for ring in rings for x, y in ring]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _union(boxes):
+    return (
+        min(b[0] for b in boxes),
+        min(b[1] for b in boxes),
+        max(b[2] for b in boxes),
+        max(b[3] for b in boxes),
+    )
+
+
+def _contains(bbox, x, y):
+    return bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]
+
+
+def _in_ring(x, y, ring):
+    """ray casting, is (x, y) inside the closed ring of (x, y) points"""
+    inside = False
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def _in_polygon(x, y, polygon):
+    exterior, *holes = polygon
+    return _in_ring(x, y, exterior) and not any(_in_ring(x, y, h) for h in holes)
+
+
+class _Node:
+    def __init__(self, children, leaf):
+        self.children = children
+        self.leaf = leaf
+        self.bbox = _union([child.bbox for child in children])
+
+
+class _Boundary:
+    def __init__(self, division_id, polygons):
+        self.division_id = division_id
+        self.polygons = polygons
+        self.bbox = _union([_bbox(polygon) for polygon in polygons])
+
+    def contains(self, x, y):
+        return any(_in_polygon(x, y, polygon) for polygon in self.polygons)
+
+
+def _str_pack(items, leaf):
+    """
+    group items into nodes with Sort-Tile-Recursive packing: sort by x, cut into
+    vertical slices, sort each slice by y & fill nodes from it
+    """
+    node_count = -(-len(items) // NODE_CAPACITY)
+    slice_count = max(int(node_count**0.5), 1)
+    slice_size = -(-len(items) // slice_count)
+
+    items = sorted(items, key=lambda i: i.bbox[0] + i.bbox[2])
+    nodes = []
+    for start in range(0, len(items), slice_size):
+        tile = sorted(
+            items[start : start + slice_size], key=lambda i: i.bbox[1] + i.bbox[3]
+        )
+        for n in range(0, len(tile), NODE_CAPACITY):
+            nodes.append(_Node(tile[n : n + NODE_CAPACITY], leaf))
+    return nodes
+
+
+class DivisionIndex:
+    """
+    R-tree of division boundaries, built once with STR packing
+
+    coordinates are (longitude, latitude) as in GeoJSON
+    """
+
+    def __init__(self, boundaries):
+        self.size = len(boundaries)
+        self.root = None
+        if not boundaries:
+            return
+        nodes = _str_pack(boundaries, leaf=True)
+        while len(nodes) > 1:
+            nodes = _str_pack(nodes, leaf=False)
+        self.root = nodes[0]
+
+    @classmethod
+    def from_features(cls, features):
+        boundaries = []
+        for feature in features:
+            properties = feature.get("properties") or {}
+            division_id = (
+                properties.get("division_id")
+                or properties.get("ocdid")
+                or feature.get("id")
+            )
+            geometry = feature["geometry"]
+            if geometry["type"] == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry["type"] == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+            boundaries.append(_Boundary(division_id, polygons))
+        return cls(boundaries)
+
+    def lookup(self, lng, lat):
+        """ids of the divisions containing the point"""
+        found = []
+        stack = [self.root] if self.root and _contains(self.root.bbox, lng, lat) else []
+        while stack:
+            node = stack.pop()
+            for child in node.children:
+                if not _contains(child.bbox, lng, lat):
+                    continue
+                if not node.leaf:
+                    stack.append(child)
+                elif child.contains(lng, lat):
+                    found.append(child.division_id)
+        return sorted(found)
+
+
+def load_division_index(directory):
+    """index every feature of the GeoJSON files in directory"""
+    features = []
+    for filename in sorted(glob.glob(os.path.join(directory, "*.geojson"))):
+        with open(filename) as f:
+            features.extend(json.load(f)["features"])
+    return DivisionIndex.from_features(features)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_division_index():
+    """process-wide index of settings.DIVISION_BOUNDARIES_DIR, None if not set"""
+    global _index
+    if not settings.DIVISION_BOUNDARIES_DIR:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = load_division_index(settings.DIVISION_BOUNDARIES_DIR)
+    return _index
+
+
+def _state_division(division_id):
+    m = re.match(r"ocd-division/country:us/(state|district|territory):\w+", division_id)
+    return m and m.group(0)
+
+
+def _remote_divisions(lat, lng):
     url = f"https://v3.openstates.org/divisions.geo?lat={lat}&lng={lng}"
     divisions = []
     try:
-        data = requests.get(url).json()
+        data = requests.get(url, timeout=5).json()
         for d in data["divisions"]:
             divisions.append(d["id"])
         divisions.append(metadata.lookup(abbr=d["state"]).division_id)
@@ -14,3 +182,27 @@ def coords_to_divisions(lat, lng):
         # be very resilient
         pass
     return divisions
+
+
+@lru_cache(maxsize=10000)
+def _local_divisions(lat, lng):
+    divisions = get_division_index().lookup(lng, lat)
+    # people(latitude, longitude) also matches statewide offices
+    states = {_state_division(d) for d in divisions} - {None}
+    return tuple(divisions + sorted(states - set(divisions)))
+
+
+def coords_to_divisions(lat, lng):
+    """
+    ids of the divisions a point is in, along with its state's
+
+    looked up locally when DIVISION_BOUNDARIES_DIR is set, after rounding to
+    COORDINATE_PRECISION, otherwise by asking v3.openstates.org
+    """
+    if get_division_index() is None:
+        return _remote_divisions(lat, lng)
+    return list(
+        _local_divisions(
+            round(lat, COORDINATE_PRECISION), round(lng, COORDINATE_PRECISION)
+        )
+    )
@@ -0,0 +1,156 @@
+import copy
+import time
+import threading
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from openstates.data.models import Bill, Jurisdiction, LegislativeSession, Organization
+
+# only changes a few times a year, saves in this process invalidate it sooner
+METADATA_TTL = 10 * 60
+CHAMBER_CLASSIFICATIONS = ("upper", "lower", "legislature")
+
+
+def _load_jurisdictions():
+    return {j.id: j for j in Jurisdiction.objects.all()}
+
+
+def _load_chambers():
+    """chamber & legislature organizations by jurisdiction id"""
+    orgs = list(
+        Organization.objects.filter(
+            classification__in=CHAMBER_CLASSIFICATIONS
+        ).select_related("jurisdiction")
+    )
+    by_id = {org.id: org for org in orgs}
+    chambers = {}
+    for org in orgs:
+        # so that org.parent doesn't need a query either
+        if org.parent_id in by_id:
+            org.parent = by_id[org.parent_id]
+        chambers.setdefault(org.jurisdiction_id, []).append(org)
+    return chambers
+
+
+def _load_sessions_with_bills():
+    sessions = {}
+    for session in (
+        LegislativeSession.objects.annotate(bill_count=Count("bills"))
+        .filter(bill_count__gt=0)
+        .order_by("-start_date", "-identifier")
+    ):
+        sessions.setdefault(session.jurisdiction_id, []).append(session)
+    return sessions
+
+
+class MetadataRegistry:
+    """
+    process-wide copy of jurisdictions, legislative sessions & chambers
+
+    each kind of metadata is loaded with a single query the first time it is
+    needed and kept for ttl seconds, or until invalidate() (called whenever one
+    is saved or deleted in this process). only one thread reloads each kind at
+    a time, while it does the others use the expired copy
+
+    callers get copies so they're free to annotate them
+    """
+
+    loaders = {
+        "jurisdictions": _load_jurisdictions,
+        "chambers": _load_chambers,
+        "sessions_with_bills": _load_sessions_with_bills,
+    }
+
+    def __init__(self, ttl=METADATA_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}
+        # bumped by invalidate(), so a load that was already running isn't kept
+        self.generations = {}
+        self.load_locks = {name: threading.Lock() for name in self.loaders}
+
+    def _get(self, name):
+        with self.lock:
+            entry = self.entries.get(name)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        # one thread (re)loads at a time, rather than every request thread at
+        # once, the others carry on with the expired value if there is one
+        load_lock = self.load_locks[name]
+        if not load_lock.acquire(blocking=entry is None):
+            return entry[1]
+        try:
+            with self.lock:
+                entry = self.entries.get(name)
+                generation = self.generations.get(name, 0)
+            # loaded by another thread while this one waited
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            value = self.loaders[name]()
+            with self.lock:
+                if self.generations.get(name, 0) == generation:
+                    self.entries[name] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            load_lock.release()
+
+    def warm(self):
+        for name in self.loaders:
+            self._get(name)
+
+    def invalidate(self, *names):
+        """drop the given kinds of metadata, or all of them"""
+        with self.lock:
+            for name in names or list(self.loaders):
+                self.entries.pop(name, None)
+                self.generations[name] = self.generations.get(name, 0) + 1
+
+    def jurisdiction(self, id=None, name=None):
+        for jurisdiction in self._get("jurisdictions").values():
+            if (id and jurisdiction.id == id) or (name and jurisdiction.name == name):
+                return copy.copy(jurisdiction)
+        raise Jurisdiction.DoesNotExist(f"no jurisdiction id={id} name={name}")
+
+    def latest_update(self, jid=None):
+        """when bills or people were last imported into a jurisdiction, or any"""
+        jurisdictions = self._get("jurisdictions").values()
+        if jid:
+            jurisdictions = [j for j in jurisdictions if j.id == jid]
+        return max(
+            (max(j.latest_bill_update, j.latest_people_update) for j in jurisdictions),
+            default=None,
+        )
+
+    def chambers(self, jid):
+        """upper, lower & legislature organizations of a jurisdiction"""
+        return [copy.copy(org) for org in self._get("chambers").get(jid, [])]
+
+    def organization(self, id):
+        """a chamber or legislature, None for any other organization"""
+        for orgs in self._get("chambers").values():
+            for org in orgs:
+                if org.id == id:
+                    return copy.copy(org)
+        return None
+
+    def sessions_with_bills(self, jid):
+        return [
+            copy.copy(session)
+            for session in self._get("sessions_with_bills").get(jid, [])
+        ]
+
+
+registry = MetadataRegistry()
+
+
+def _invalidate(sender, **kwargs):
+    if sender is Bill:
+        # only matters once a session gets its first bill or loses its last
+        registry.invalidate("sessions_with_bills")
+    else:
+        registry.invalidate()
+
+
+for _model in (Jurisdiction, LegislativeSession, Organization, Bill):
+    post_save.connect(_invalidate, sender=_model, dispatch_uid="metadata-registry")
+    post_delete.connect(_invalidate, sender=_model, dispatch_uid="metadata-registry")
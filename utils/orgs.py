@@ -1,14 +1,10 @@
 from .common import abbr_to_jid, pretty_url
+from .metadata import registry
 from openstates.data.models import Organization
 
 
 def get_chambers_from_abbr(abbr):
-    jid = abbr_to_jid(abbr)
-    orgs = list(
-        Organization.objects.filter(
-            jurisdiction_id=jid, classification__in=["upper", "lower", "legislature"]
-        )
-    )
+    orgs = registry.chambers(abbr_to_jid(abbr))
     if len(orgs) == 3:
         orgs = [org for org in orgs if org.classification != "legislature"]
 
@@ -16,10 +12,10 @@ def get_chambers_from_abbr(abbr):
 
 
 def get_legislature_from_abbr(abbr):
-    legislature = Organization.objects.select_related("jurisdiction").get(
-        classification="legislature", jurisdiction_id=abbr_to_jid(abbr)
-    )
-    return legislature
+    for org in registry.chambers(abbr_to_jid(abbr)):
+        if org.classification == "legislature":
+            return org
+    raise Organization.DoesNotExist(f"no legislature for {abbr}")
 
 
 def org_as_dict(org):
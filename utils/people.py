@@ -1,3 +1,5 @@
+from openstates.data.models import Person
+from public.models import CurrentMembership
 from .common import pretty_url
 
 
@@ -10,3 +12,17 @@ def person_as_dict(person):
         "current_role": person.current_role,
         "pretty_url": pretty_url(person),
     }
+
+
+def current_legislators_with_roles(chambers):
+    """
+    people currently serving in any of chambers
+
+    same as Person.objects.current_legislators_with_roles, but read from the
+    CurrentMembership view, callers only need the denormalized current_role
+    """
+    return Person.objects.filter(
+        id__in=CurrentMembership.objects.filter(organization__in=chambers).values(
+            "person_id"
+        )
+    )
@@ -0,0 +1,94 @@
+import json
+import pytest
+from utils import geo
+from utils.geo import DivisionIndex, coords_to_divisions
+
+AK = "ocd-division/country:us/state:ak"
+
+
+def _square(x, y, size):
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+
+
+def _feature(division_id, geometry_type, coordinates):
+    return {
+        "type": "Feature",
+        "properties": {"division_id": division_id},
+        "geometry": {"type": geometry_type, "coordinates": coordinates},
+    }
+
+
+FEATURES = [
+    # two lower districts side by side, one upper district over both
+    _feature(f"{AK}/sldl:1", "Polygon", [_square(-150, 60, 1)]),
+    _feature(f"{AK}/sldl:2", "Polygon", [_square(-149, 60, 1)]),
+    _feature(f"{AK}/sldu:a", "Polygon", [_square(-150, 60, 2)]),
+    # a district with a hole in it & one in two pieces
+    _feature(f"{AK}/sldl:3", "Polygon", [_square(-140, 60, 3), _square(-139, 61, 1)]),
+    _feature(
+        f"{AK}/sldl:4",
+        "MultiPolygon",
+        [[_square(-139, 61, 1)], [_square(-130, 60, 1)]],
+    ),
+]
+
+
+@pytest.fixture
+def boundaries(tmp_path, settings):
+    with open(tmp_path / "ak.geojson", "w") as f:
+        json.dump({"type": "FeatureCollection", "features": FEATURES}, f)
+    settings.DIVISION_BOUNDARIES_DIR = str(tmp_path)
+    geo._index = None
+    geo._local_divisions.cache_clear()
+    yield
+    geo._index = None
+    geo._local_divisions.cache_clear()
+
+
+def test_lookup():
+    index = DivisionIndex.from_features(FEATURES)
+    assert index.lookup(-149.5, 60.5) == [f"{AK}/sldl:1", f"{AK}/sldu:a"]
+    assert index.lookup(-148.5, 61.5) == [f"{AK}/sldu:a"]
+    assert index.lookup(-100, 40) == []
+
+
+def test_lookup_holes_and_multipolygons():
+    index = DivisionIndex.from_features(FEATURES)
+    assert index.lookup(-139.5, 60.5) == [f"{AK}/sldl:3"]
+    # the hole of sldl:3 is filled by part of sldl:4
+    assert index.lookup(-138.5, 61.5) == [f"{AK}/sldl:4"]
+    assert index.lookup(-129.5, 60.5) == [f"{AK}/sldl:4"]
+
+
+def test_lookup_many_boundaries():
+    # enough boundaries for a few levels of nodes
+    features = [
+        _feature(
+            f"ocd-division/country:us/state:zz/sldl:{x}-{y}",
+            "Polygon",
+            [_square(x, y, 1)],
+        )
+        for x in range(40)
+        for y in range(40)
+    ]
+    index = DivisionIndex.from_features(features)
+    assert not index.root.leaf
+    assert index.lookup(12.5, 33.5) == ["ocd-division/country:us/state:zz/sldl:12-33"]
+    assert index.lookup(40.5, 0.5) == []
+
+
+def test_coords_to_divisions(boundaries):
+    assert coords_to_divisions(60.5, -149.5) == [
+        f"{AK}/sldl:1",
+        f"{AK}/sldu:a",
+        AK,
+    ]
+    assert coords_to_divisions(40, -100) == []
+
+
+def test_coords_to_divisions_cached(boundaries):
+    coords_to_divisions(60.50001, -149.50001)
+    coords_to_divisions(60.49999, -149.49999)
+    # both round to the same point
+    info = geo._local_divisions.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
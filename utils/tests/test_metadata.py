@@ -0,0 +1,101 @@
+import threading
+import time
+import pytest
+from openstates.data.models import Bill, Organization
+from graphapi.tests.utils import populate_db
+from utils.metadata import MetadataRegistry, registry
+from utils.orgs import get_chambers_from_abbr, get_legislature_from_abbr
+
+AK = "ocd-jurisdiction/country:us/state:ak/government"
+
+
+@pytest.mark.django_db
+def setup():
+    populate_db()
+
+
+@pytest.mark.django_db
+def test_loaded_once(django_assert_num_queries):
+    metadata = MetadataRegistry()
+    with django_assert_num_queries(1):
+        metadata.chambers(AK)
+        metadata.organization(metadata.chambers(AK)[0].id)
+    with django_assert_num_queries(0):
+        metadata.chambers(AK)
+
+
+@pytest.mark.django_db
+def test_ttl(django_assert_num_queries):
+    metadata = MetadataRegistry(ttl=0)
+    metadata.chambers(AK)
+    with django_assert_num_queries(1):
+        metadata.chambers(AK)
+
+
+def _concurrently(fn, threads=8):
+    results = []
+    workers = [
+        threading.Thread(target=lambda: results.append(fn())) for _ in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+@pytest.mark.django_db
+def test_loaded_by_one_thread():
+    calls = []
+
+    def load():
+        calls.append(None)
+        time.sleep(0.2)
+        return len(calls)
+
+    metadata = MetadataRegistry()
+    metadata.loaders = {"x": load}
+    metadata.load_locks = {"x": threading.Lock()}
+    # nothing loaded yet, so the others wait for it
+    assert _concurrently(lambda: metadata._get("x")) == [1] * 8
+    assert len(calls) == 1
+
+    # expired, so the others use the old value while it is reloaded
+    metadata.entries["x"] = (0, 1)
+    results = _concurrently(lambda: metadata._get("x"))
+    assert set(results) == {1, 2}
+    assert len(calls) == 2
+
+
+@pytest.mark.django_db
+def test_copies():
+    chamber = registry.chambers(AK)[0]
+    chamber.parties = {"Republican": 4}
+    assert not hasattr(registry.chambers(AK)[0], "parties")
+
+
+@pytest.mark.django_db
+def test_invalidated_on_save():
+    assert get_legislature_from_abbr("ak").name == "Alaska Legislature"
+    legislature = Organization.objects.get(
+        jurisdiction_id=AK, classification="legislature"
+    )
+    legislature.name = "Alaska State Legislature"
+    legislature.save()
+    assert get_legislature_from_abbr("ak").name == "Alaska State Legislature"
+    assert {c.classification for c in get_chambers_from_abbr("ak")} == {
+        "upper",
+        "lower",
+    }
+
+    # deleting a session's bills removes it from sessions_with_bills
+    assert [s.identifier for s in registry.sessions_with_bills(AK)] == ["2018", "2017"]
+    Bill.objects.filter(legislative_session__identifier="2017").delete()
+    assert [s.identifier for s in registry.sessions_with_bills(AK)] == ["2018"]
+
+
+@pytest.mark.django_db
+def test_missing():
+    with pytest.raises(Organization.DoesNotExist):
+        get_legislature_from_abbr("nc")
+    assert registry.organization("ocd-organization/nonsense") is None
@@ -249,7 +249,24 @@ CORS_ALLOW_METHODS = ["GET", "POST", "OPTIONS"]
 CORS_ALLOW_HEADERS = default_headers + ("x-api-key",)
 
 
+# directory of GeoJSON district boundaries for looking up legislators by location,
+# features need a division_id (or ocdid) property
+DIVISION_BOUNDARIES_DIR = os.environ.get("DIVISION_BOUNDARIES_DIR")
+
 GRAPHENE = {"SCHEMA": "graphapi.schema.schema", "MIDDLEWARE": []}
+# log per-resolver timings & query counts of every GraphQL request, not just staff's
+GRAPHQL_TRACING = os.environ.get("GRAPHQL_TRACING", "false").lower() == "true"
+# serve /graphql with AsyncKeyedGraphQLView, for running under ASGI (web.asgi)
+GRAPHQL_ASYNC = os.environ.get("GRAPHQL_ASYNC", "false").lower() == "true"
+# threads (and so database connections) resolving root fields concurrently
+GRAPHQL_ROOT_FIELD_WORKERS = int(os.environ.get("GRAPHQL_ROOT_FIELD_WORKERS", 8))
+# seconds to cache query results for, 0 to not cache them
+GRAPHQL_RESULT_CACHE_TIMEOUT = int(os.environ.get("GRAPHQL_RESULT_CACHE_TIMEOUT", 0))
+# seconds to keep persisted queries for, clients that send an expired (or
+# evicted) hash are asked to send the query again
+GRAPHQL_PERSISTED_QUERY_TIMEOUT = int(
+    os.environ.get("GRAPHQL_PERSISTED_QUERY_TIMEOUT", 7 * 24 * 60 * 60)
+)
 
 
 # structlog config
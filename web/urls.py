@@ -3,10 +3,19 @@ from django.conf import settings
 from django.contrib import admin
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView, RedirectView
-from graphapi.views import KeyedGraphQLView
+from graphapi.views import AsyncKeyedGraphQLView, KeyedGraphQLView
 from graphapi.middleware import QueryProtectionMiddleware
+from graphapi.tracing import TracingMiddleware
 from bundles.views import bundle_view
 
+graphql_options = dict(
+    graphiql=True,
+    middleware=[QueryProtectionMiddleware(5000), TracingMiddleware()],
+)
+if settings.GRAPHQL_ASYNC:
+    graphql_view = AsyncKeyedGraphQLView.as_view(**graphql_options)
+else:
+    graphql_view = csrf_exempt(KeyedGraphQLView.as_view(**graphql_options))
 
 urlpatterns = [
     path("djadmin/", admin.site.urls),
@@ -14,14 +23,7 @@ urlpatterns = [
     path("accounts/", include("allauth.urls")),
     path("accounts/profile/", include("profiles.urls")),
     path("dashboard/", include("dashboards.urls")),
-    re_path(
-        "^graphql/?$",
-        csrf_exempt(
-            KeyedGraphQLView.as_view(
-                graphiql=True, middleware=[QueryProtectionMiddleware(5000)]
-            )
-        ),
-    ),
+    re_path("^graphql/?$", graphql_view),
     path("", include("public.urls")),
     path("", include("web.redirects")),
     path("data/", include("bulk.urls")),
@@ -13,3 +13,10 @@ except Exception as e:
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web.settings")
 
 application = get_wsgi_application()
+
+try:
+    from utils.metadata import registry
+
+    registry.warm()
+except Exception as e:
+    print("metadata registry couldn't be warmed:", e)